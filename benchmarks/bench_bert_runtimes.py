@@ -0,0 +1,84 @@
+"""PyTorch fp32 vs ONNX Runtime int8 BERT on CPU: per-query latency, bulk throughput and
+agreement with the fp32 vectors.
+
+    python benchmarks/bench_bert_runtimes.py --threads 4 --queries 200 --bulk 5000
+
+Exports the int8 model on first use (see embedders.bert_onnx).
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ingest_prep import make_offers
+from scraping_engine.ingestion import prepare_offers
+from embedders.bert_embedder import _BERT_MODEL_NAME
+from embedders import bert_onnx
+
+QUERIES = ["milk", "günstiger Kaffee", "Bio Äpfel", "Bier Kasten", "vegan cheese", "Windeln Größe 4"]
+
+
+def load_runtimes(threads: int):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+    bert_onnx.export(_BERT_MODEL_NAME)
+    return {
+        "torch fp32": SentenceTransformer(_BERT_MODEL_NAME, device="cpu"),
+        "onnx int8": bert_onnx.load_onnx_model(_BERT_MODEL_NAME, threads),
+    }
+
+
+def query_latency(model, n: int):
+    model.encode(QUERIES, convert_to_numpy=True)
+    timings = []
+    for i in range(n):
+        start = time.perf_counter()
+        model.encode([QUERIES[i % len(QUERIES)]], convert_to_numpy=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def bulk_throughput(model, texts, batch_size: int):
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    return len(texts) / (time.perf_counter() - start), vectors
+
+
+def main(threads: int, queries: int, bulk: int, batch_size: int):
+    texts = prepare_offers(make_offers(bulk))["pagecontent"].tolist()
+    runtimes = load_runtimes(threads)
+
+    print(f"{len(texts)} offer texts, {queries} single queries, batch {batch_size}, "
+          f"threads {threads or 'default'}")
+    print(f"{'runtime':<12} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9} {'min cos':>8} {'mean cos':>9}")
+
+    reference = None
+    for name, model in runtimes.items():
+        p50, p95 = query_latency(model, queries)
+        rate, vectors = bulk_throughput(model, texts, batch_size)
+        if reference is None:
+            reference = vectors
+        norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(vectors, axis=1)
+        cosine = np.sum(reference * vectors, axis=1) / norms
+        print(f"{name:<12} {p50:8.2f} {p95:8.2f} {rate:9.0f} {cosine.min():8.4f} {cosine.mean():9.4f}")
+
+    threshold_ok = bert_onnx.min_cosine(reference, vectors) >= bert_onnx.BERT_ONNX_MIN_COSINE
+    print(f"int8 agreement {'above' if threshold_ok else 'BELOW'} BERT_ONNX_MIN_COSINE "
+          f"({bert_onnx.BERT_ONNX_MIN_COSINE})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the BERT runtimes on CPU")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("BERT_THREADS", "0")))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--bulk", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    main(args.threads, args.queries, args.bulk, args.batch_size)
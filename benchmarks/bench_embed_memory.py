@@ -0,0 +1,113 @@
+"""Peak memory and CPU time of a large ingest: Python float lists vs float32 arrays from
+the embedder through to the upsert requests.
+
+    python benchmarks/bench_embed_memory.py --rows 20000 --dim 2560
+
+Each path runs in its own process against a fake embedder (returns float32 arrays, like the
+BERT model) and a fake Qdrant that serializes every upsert request like the REST client.
+The embedding cache is disabled so both paths do the same work.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import subprocess
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["EMBED_CACHE_MAX_MB"] = "0"
+
+from benchmarks.bench_ingest_prep import make_offers, legacy_points, PINCODE, VALIDITY
+from embedders.embedding_cache import cached_embed
+from scraping_engine import upsert
+from scraping_engine.ingestion import Backend, prepare_offers, point_id, build_batch
+from qdrant_client import models
+
+
+class FakeQdrant:
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+    def upsert(self, collection, points, wait=True):
+        if isinstance(points, models.Batch):
+            body = models.PointsBatch(batch=points).model_dump_json()
+        else:
+            body = models.PointsList(points=points).model_dump_json()
+        self.requests += 1
+        self.bytes += len(body)
+
+
+def fake_model(dim: int):
+    def encode(texts):
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), dim)).astype(np.float32)
+    return encode
+
+
+# The list path this benchmark replaced: the cache returned lists, extended into one list per ingest
+def legacy_embed_texts(backend, texts):
+    vectors = []
+    for i in range(0, len(texts), backend.embed_batch_size):
+        chunk = backend.embed(texts[i:i + backend.embed_batch_size])
+        vectors.extend(np.asarray(v, dtype=np.float32).tolist() for v in chunk)
+    return vectors
+
+
+def run(mode: str, rows: int, dim: int):
+    df = prepare_offers(make_offers(rows))
+    df = df.assign(point_id=[point_id(k, "offers") for k in df["unique_key"]])
+    df = df.drop_duplicates("point_id")
+    texts = df["pagecontent"].tolist()
+    backend = Backend(name="bench", collection="offers", embed=lambda t: cached_embed("bench", t, fake_model(dim)),
+                      embed_batch_size=256)
+    upsert.qdrant = FakeQdrant()
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.process_time()
+    if mode == "lists":
+        vectors = legacy_embed_texts(backend, texts)
+        points = legacy_points(df, vectors, PINCODE, VALIDITY)
+    else:
+        vectors = backend.embed_texts(texts)
+        points = build_batch(df, vectors, PINCODE, VALIDITY)
+    upsert.upsert_points("offers", points, parallel=1)
+    cpu = time.process_time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{mode} {len(texts)} {cpu:.3f} {(peak - baseline) / 1024:.1f} {upsert.qdrant.requests} {upsert.qdrant.bytes}")
+
+
+def main(rows: int, dim: int):
+    results = {}
+    for mode in ["lists", "arrays"]:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--rows", str(rows), "--dim", str(dim)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1].split()
+        results[mode] = {"points": int(out[1]), "cpu": float(out[2]), "peak_mb": float(out[3]),
+                         "requests": int(out[4]), "bytes": int(out[5])}
+
+    lists, arrays = results["lists"], results["arrays"]
+    print(f"{lists['points']} points, dim {dim}, {arrays['requests']} upsert requests "
+          f"({arrays['bytes'] / 1024 / 1024:.0f} MB serialized)")
+    print(f"{'path':<8} {'CPU s':>8} {'peak MB':>9}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['cpu']:8.2f} {r['peak_mb']:9.1f}")
+    print(f"arrays: {lists['cpu'] / arrays['cpu']:.1f}x less CPU, "
+          f"{lists['peak_mb'] / max(arrays['peak_mb'], 0.1):.1f}x lower peak memory growth")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory and CPU of the ingest embedding path")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=2560)
+    parser.add_argument("--mode", choices=["lists", "arrays"], help="run one path (used internally)")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.rows, args.dim)
+    else:
+        main(args.rows, args.dim)
@@ -0,0 +1,165 @@
+"""Row-wise vs vectorized ingest preparation: checks identical output and prints timings.
+
+    python benchmarks/bench_ingest_prep.py --rows 5000 --repeat 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cleaning.helpers import clean_price, build_unique_key
+from scraping_engine.ingestion import ETL_VERSION, prepare_offers, point_id, diff_offers, build_batch
+from qdrant_client import models
+
+PINCODE = "10115"
+VALIDITY = {"valid_from": "2026-10-12T00:00:00", "valid_until": "2026-10-19T00:00:00", "scraped_at": "2026-10-14T09:30:00"}
+PRICE_FORMATS = [
+    lambda p: f"{p:.2f}".replace(".", ",") + " €",
+    lambda p: f"€ {p:.2f}",
+    lambda p: f"{p:.2f}",
+    lambda p: p,
+    lambda p: int(p),
+    lambda p: "",
+    lambda p: None,
+    lambda p: "ab 1,99",
+]
+
+
+def make_offers(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        price = round(rng.uniform(0.29, 49.99), 2)
+        records.append({
+            "category": rng.choice(["Obst & Gemüse", "Getränke", "Kühlregal", None]),
+            "product_name": rng.choice([f"Produkt {i % 900}", f"  Produkt  {i % 900} ", "", f"BIO Apfel {i % 50}"]),
+            "price": rng.choice(PRICE_FORMATS)(price),
+            "product_url": rng.choice([f"https://example.com/p/{i}", None]),
+            "pincode": PINCODE,
+            "store_name": rng.choice(["REWE", "ALDI", "aldi "]),
+        })
+    return pd.DataFrame(records)
+
+
+# --- the row-wise implementation this benchmark replaced ---
+
+def legacy_prepare(df):
+    df = df.copy()
+    df["price"] = df["price"].apply(clean_price)
+    df = df.dropna(subset=["product_name", "price"])
+    df = df[df["product_name"].str.strip() != ""]
+    df["unique_key"] = df.apply(build_unique_key, axis=1)
+    df = df.drop_duplicates("unique_key")
+    df["pagecontent"] = df.apply(
+        lambda r: f"{r['product_name']} | {r['category']} | {r['store_name']}",
+        axis=1
+    )
+    return df
+
+
+def legacy_diff(df, existing, pincode):
+    new_rows = []
+    update_ids = []
+    for _, row in df.iterrows():
+        pid = row["point_id"]
+        if pid in existing:
+            if existing[pid] not in ("ALL", pincode):
+                update_ids.append(pid)
+        else:
+            new_rows.append(row)
+    return pd.DataFrame(new_rows), update_ids
+
+
+def legacy_points(new_df, vectors, pincode, validity):
+    new_df = new_df.assign(embedding=vectors)
+    return [
+        models.PointStruct(
+            id=row["point_id"],
+            vector=row["embedding"],
+            payload={
+                "category": row["category"],
+                "product_name": row["product_name"],
+                "price": float(row["price"]),
+                "pincode": pincode,
+                "store_name": row["store_name"],
+                "product_url": row.get("product_url"),
+                "etl_version": ETL_VERSION,
+                **validity,
+            }
+        )
+        for _, row in new_df.iterrows()
+    ]
+
+
+def run(prepare, diff, points, df, existing, vectors_for):
+    prepared = prepare(df)
+    prepared = prepared.assign(point_id=[point_id(k, "offers") for k in prepared["unique_key"]])
+    new_df, update_ids = diff(prepared, existing, PINCODE)
+    return prepared, new_df, update_ids, points(new_df, vectors_for(new_df), PINCODE, VALIDITY)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_offers(args.rows)
+
+    # Half the keys already stored: some for every pincode, some for another one, some for this one
+    reference = legacy_prepare(df)
+    rng = random.Random(7)
+    existing = {
+        point_id(k, "offers"): rng.choice(["ALL", "20095", PINCODE])
+        for k in reference["unique_key"] if rng.random() < 0.5
+    }
+
+    def vectors_for(new_df):
+        return np.array([[float(i), 0.0] for i in range(len(new_df))], dtype=np.float32)
+
+    legacy_s, (old_prep, old_new, old_updates, old_points) = timed(
+        lambda: run(legacy_prepare, legacy_diff, legacy_points, df, existing, lambda d: vectors_for(d).tolist()),
+        args.repeat
+    )
+    fast_s, (new_prep, new_new, new_updates, new_batch) = timed(
+        lambda: run(prepare_offers, diff_offers, build_batch, df, existing, vectors_for), args.repeat
+    )
+
+    # Equivalence
+    for column in ["price", "unique_key", "pagecontent"]:
+        assert all(_same(a, b) for a, b in zip(old_prep[column], new_prep[column])), column
+    assert list(old_prep.index) == list(new_prep.index), "kept rows differ"
+    assert list(old_new["point_id"]) == list(new_new["point_id"]), "new rows differ"
+    assert set(old_updates) == set(new_updates), "update ids differ"
+    assert len(old_points) == len(new_batch)
+    for a, pid, vector, payload in zip(old_points, new_batch.ids, new_batch.vectors, new_batch.payloads):
+        assert a.id == pid and a.vector == vector.tolist(), "point differs"
+        assert list(a.payload) == list(payload), "payload field order differs"
+        assert all(_same(a.payload[k], payload[k]) for k in a.payload), f"payload differs: {a.payload} {payload}"
+
+    print(f"rows={args.rows} kept={len(new_prep)} new={len(new_new)} update={len(set(new_updates))}")
+    print(f"row-wise:   {legacy_s * 1000:8.1f} ms")
+    print(f"vectorized: {fast_s * 1000:8.1f} ms  ({legacy_s / fast_s:.1f}x faster)")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
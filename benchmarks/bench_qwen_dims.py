@@ -0,0 +1,100 @@
+"""Recall vs size of the Qwen vector settings on the fixture query set.
+
+    python benchmarks/bench_qwen_dims.py --dims 2560 1024 512 256 128 --k 4 --points 2000000
+
+For every output dimension (Matryoshka truncation + renormalization) and storage type the
+report shows bytes per vector, the size of `--points` vectors, recall@k against the full
+float32 neighbours, hit@k on the labelled matches, and the brute-force float32 scan time per
+query for each dimension. NumPy has no fast float16/int8 kernels, so the scan time of those
+storage types is not shown; it has to be measured in Qdrant.
+Full vectors come from the embedding cache, so only the first run needs Ollama.
+int8 is simulated like Qdrant's scalar quantization (one 0.99-quantile range for all values).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ingest_prep import make_offers
+from scraping_engine.ingestion import prepare_offers
+from embedders.embedding_cache import cached_embed
+from embedders.qwen_embedder import QWEN_EMBED_MODEL, get_client, truncate_embeddings
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "qwen_recall.json")
+BYTES_PER_VALUE = {"float32": 4, "float16": 2, "int8": 1}
+
+
+def embed_full(texts):
+    return np.asarray(cached_embed(QWEN_EMBED_MODEL, texts, get_client().embed), dtype=np.float32)
+
+
+def stored(vectors, storage: str):
+    if storage == "float16":
+        return vectors.astype(np.float16).astype(np.float32)
+    if storage == "int8":
+        lo, hi = np.quantile(vectors, [0.005, 0.995])
+        scale = (hi - lo) / 255
+        codes = np.round((np.clip(vectors, lo, hi) - lo) / scale)
+        return codes * scale + lo
+    return vectors
+
+
+def top_k(queries, offers, k: int):
+    norms = np.linalg.norm(offers, axis=1)
+    scores = (queries @ offers.T) / np.where(norms == 0, 1, norms)
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def scan_ms(queries, offers, repeat: int = 5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        queries @ offers.T
+    return (time.perf_counter() - start) * 1000 / repeat / len(queries)
+
+
+def main(dims, storages, k: int, distractors: int, points: int):
+    with open(FIXTURE, encoding="utf-8") as f:
+        fixture = json.load(f)
+    offer_texts = fixture["offers"]
+    if distractors:
+        offer_texts = offer_texts + prepare_offers(make_offers(distractors))["pagecontent"].drop_duplicates().tolist()
+    query_texts = [q["query"] for q in fixture["queries"]]
+    relevant = [set(q["relevant"]) for q in fixture["queries"]]
+
+    offers_full = embed_full(offer_texts)
+    queries_full = embed_full(query_texts)
+    full_dim = offers_full.shape[1]
+    reference = top_k(queries_full, offers_full, k)
+
+    print(f"{len(offer_texts)} offers, {len(query_texts)} queries, k={k}, full dimension {full_dim}, "
+          f"size for {points:,} points")
+    print(f"{'dim':>5} {'storage':<8} {'B/vector':>9} {'size MB':>9} {'recall@k':>9} {'hit@k':>6} {'scan ms':>8}")
+
+    for dim in dims:
+        dim = min(dim, full_dim)
+        offers = truncate_embeddings(offers_full, dim)
+        queries = truncate_embeddings(queries_full, dim)
+        for storage in storages:
+            found = top_k(queries, stored(offers, storage), k)
+            recall = np.mean([len(set(f) & set(r)) / k for f, r in zip(found, reference)])
+            hits = np.mean([bool(set(f) & rel) for f, rel in zip(found, relevant)])
+            size = dim * BYTES_PER_VALUE[storage]
+            scan = f"{scan_ms(queries, offers):>8.3f}" if storage == "float32" else f"{'-':>8}"
+            print(f"{dim:>5} {storage:<8} {size:>9} {size * points / 1024 / 1024:>9.0f} {recall:>9.3f} "
+                  f"{hits:>6.2f} {scan}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs size report for the Qwen vector settings")
+    parser.add_argument("--dims", type=int, nargs="+", default=[2560, 1024, 512, 256, 128])
+    parser.add_argument("--storage", nargs="+", default=list(BYTES_PER_VALUE), choices=list(BYTES_PER_VALUE))
+    parser.add_argument("--k", type=int, default=4, help="matches the RAG search limit")
+    parser.add_argument("--distractors", type=int, default=2000, help="synthetic offers added to the fixture")
+    parser.add_argument("--points", type=int, default=1_000_000, help="collection size for the size column")
+    args = parser.parse_args()
+
+    main(args.dims, args.storage, args.k, args.distractors, args.points)
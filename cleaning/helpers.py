@@ -1,3 +1,10 @@
+import re
+import uuid
+import pandas as pd
+
+# Namespace of all point IDs; changing it re-keys every collection
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "supermarket-offers")
+
 #Convert price string to float. If conversion fails, returns None.
 def clean_price(value):
     if isinstance(value, (int, float)):
@@ -7,6 +14,42 @@ def clean_price(value):
     except:
         return None
 
-# Dedupe key: same product_name + store_name + price.
+# Lowercase and collapse whitespace so cosmetic differences do not create new offers
+def normalize_text(value):
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+# Dedupe key: same product_name + store_name. The price is payload, so a re-scrape of the
+# same pincode at a new price updates the existing offer instead of creating a second one
+def normalize_key(product_name, store_name):
+    return f"{normalize_text(product_name)}_{normalize_text(store_name)}"
+
+# Key of the same offer at one price, for a pincode where it costs something else
+def price_key(unique_key, price):
+    return f"{unique_key}_{float(price):.2f}"
+
 def build_unique_key(row):
-    return f"{row['product_name']}_{row['store_name']}_{row['price']}"
+    return normalize_key(row['product_name'], row['store_name'])
+
+# Deterministic point ID (UUIDv5); unlike hash() it is the same in every process
+def stable_id(*parts):
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, "|".join(str(p) for p in parts)))
+
+
+# Vectorized clean_price for a whole column; same values, NaN where conversion fails
+def clean_price_series(prices):
+    if pd.api.types.is_numeric_dtype(prices) and not pd.api.types.is_bool_dtype(prices):
+        return prices.astype(float)
+    text = (
+        prices.astype(str)
+        .str.replace("€", "", regex=False)
+        .str.replace(",", ".", regex=False)
+        .str.strip()
+    )
+    return pd.to_numeric(text, errors="coerce").astype(float)
+
+def normalize_text_series(values):
+    return values.astype(str).str.replace(r"\s+", " ", regex=True).str.strip().str.lower()
+
+# Vectorized build_unique_key
+def build_unique_key_series(df):
+    return normalize_text_series(df["product_name"]).str.cat(normalize_text_series(df["store_name"]), sep="_")
@@ -1,33 +1,81 @@
 import os
+import time
 import warnings
+import threading
+import urllib.error
+import numpy as np
 from typing import List, Union
 
 # Suppress PyTorch warnings for compatibility
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 warnings.filterwarnings('ignore', category=UserWarning, module='torch')
 
-from sentence_transformers import SentenceTransformer
+from embedders.embedding_cache import cached_embed
+from embedders.embed_server import request_embeddings
 
 # You can change the BERT / SBERT model here if you want
 _BERT_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
-print(f"Loading BERT model: {_BERT_MODEL_NAME}")
+# "torch" (fp32) or "onnx" (int8, CPU; see embedders.bert_onnx), and intra-op threads (0 = library default)
+BERT_RUNTIME = os.getenv("BERT_RUNTIME", "torch")
+BERT_THREADS = int(os.getenv("BERT_THREADS", "0"))
 
-try:
-    _bert_model = SentenceTransformer(_BERT_MODEL_NAME)
-    print("BERT model loaded successfully")
-except Exception as e:
-    print(f"Warning: BERT model loading issue: {e}")
-    _bert_model = None
+# Shared embedding service (python -m embedders.embed_server); empty to always encode in-process
+EMBED_SERVER_URL = os.getenv("EMBED_SERVER_URL", "http://127.0.0.1:8765")
+# After the service failed, encode locally for this long before trying it again
+SERVER_RETRY_SECONDS = 30
 
+_bert_model = None
+_model_lock = threading.Lock()
+_server_down_until = 0.0
 
-def bert_embed(texts: Union[str, List[str]]) -> List[List[float]]:
 
-    if _bert_model is None:
-        raise RuntimeError("BERT model failed to load. Please check PyTorch installation.")
-    
+# The model is only loaded in processes that actually encode (the service, or clients without one)
+def _load_model():
+    global _bert_model
+    with _model_lock:
+        if _bert_model is None:
+            print(f"Loading BERT model: {_BERT_MODEL_NAME} ({BERT_RUNTIME})")
+            try:
+                if BERT_RUNTIME == "onnx":
+                    # Any problem with the int8 model (missing packages, no export, unreadable
+                    # validation.json) falls back to fp32 instead of disabling BERT
+                    try:
+                        from embedders.bert_onnx import load_validated
+                        _bert_model = load_validated(_BERT_MODEL_NAME, BERT_THREADS)
+                    except Exception as e:
+                        print(f"[BERT] ONNX model unavailable ({e}), using PyTorch fp32")
+                if _bert_model is None:
+                    import torch
+                    from sentence_transformers import SentenceTransformer
+                    if BERT_THREADS:
+                        torch.set_num_threads(BERT_THREADS)
+                    _bert_model = SentenceTransformer(_BERT_MODEL_NAME)
+                print("BERT model loaded successfully")
+            except Exception as e:
+                print(f"Warning: BERT model loading issue: {e}")
+                raise RuntimeError("BERT model failed to load. Please check PyTorch installation.")
+    return _bert_model
+
+
+def encode_local(texts: List[str]):
+    return _load_model().encode(texts, convert_to_numpy=True)
+
+
+def _encode(texts: List[str]):
+    global _server_down_until
+    if EMBED_SERVER_URL and time.time() >= _server_down_until:
+        try:
+            return request_embeddings("bert", texts, EMBED_SERVER_URL)
+        except (urllib.error.URLError, OSError) as e:
+            _server_down_until = time.time() + SERVER_RETRY_SECONDS
+            print(f"[BERT] Embedding service unavailable ({e}), encoding in-process")
+    return encode_local(texts)
+
+
+def bert_embed(texts: Union[str, List[str]]) -> np.ndarray:
+
     if isinstance(texts, str):
         texts = [texts]
 
-    embeddings = _bert_model.encode(texts, convert_to_numpy=True)
-    return embeddings.tolist()
\ No newline at end of file
+    return cached_embed(_BERT_MODEL_NAME, texts, _encode)
@@ -0,0 +1,157 @@
+"""ONNX Runtime int8 variant of the BERT embedder for CPU-only nodes.
+
+    python -m embedders.bert_onnx --export          # export, quantize and validate once
+    python -m embedders.bert_onnx --check           # re-run the fp32 agreement check
+
+The model is exported to ONNX and dynamically quantized to int8 under BERT_ONNX_DIR.
+After the export the int8 vectors for a set of probe offers are compared with the fp32
+PyTorch vectors; the lowest cosine similarity is stored next to the model and the int8
+model is only used while it stays at or above BERT_ONNX_MIN_COSINE.
+"""
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BERT_ONNX_DIR = os.getenv(
+    "BERT_ONNX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "bert-onnx")
+)
+# Quantization kernels: avx2 runs on every x86 node we have, avx512_vnni / arm64 where available
+BERT_ONNX_QUANTIZATION = os.getenv("BERT_ONNX_QUANTIZATION", "avx2")
+BERT_ONNX_MIN_COSINE = float(os.getenv("BERT_ONNX_MIN_COSINE", "0.98"))
+VALIDATION_FILE = "validation.json"
+
+# Offer texts in the etl_version 2 format ("name | category | store") used for the agreement check
+PROBE_TEXTS = [
+    "BIO Äpfel Braeburn 1kg | Obst & Gemüse | REWE",
+    "Coca-Cola Zero 6x1,5l | Getränke | ALDI",
+    "Weihenstephan H-Milch 3,5% 1l | Kühlregal | EDEKA",
+    "Hähnchenbrustfilet 400g | Fleisch & Wurst | LIDL",
+    "Barilla Spaghetti n.5 500g | Nudeln & Reis | PENNY",
+    "Milka Alpenmilch Schokolade 100g | Süßwaren | NETTO",
+    "Ariel Universal+ Pulver 20 WL | Drogerie | KAUFLAND",
+    "Gouda jung in Scheiben 400g | Käse | REWE",
+    "Bananen Fairtrade | Obst & Gemüse | ALDI",
+    "Lavazza Crema e Gusto 1kg Bohnen | Kaffee & Tee | EDEKA",
+    "Tiefkühl Pizza Margherita | Tiefkühl | LIDL",
+    "Pampers Baby-Dry Gr. 4 | Baby | dm",
+    "milk",
+    "günstiger Kaffee",
+    "vegan cheese alternative",
+    "Bier Kasten 20x0,5l",
+]
+
+
+def quantized_file():
+    return os.path.join("onnx", f"model_qint8_{BERT_ONNX_QUANTIZATION}.onnx")
+
+
+def _session_options(threads: int):
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    return options
+
+
+def min_cosine(reference, candidate):
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    dots = np.sum(reference * candidate, axis=1)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return float(np.min(dots / norms))
+
+
+def read_validation(model_dir: str = BERT_ONNX_DIR):
+    path = os.path.join(model_dir, VALIDATION_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_onnx_model(model_name: str, threads: int = 0, model_dir: str = BERT_ONNX_DIR):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(
+        model_dir,
+        backend="onnx",
+        model_kwargs={
+            "file_name": quantized_file(),
+            "provider": "CPUExecutionProvider",
+            "session_options": _session_options(threads),
+        },
+    )
+
+
+# Agreement of the int8 model with the fp32 PyTorch model; the result is stored with the export
+def validate(model_name: str, onnx_model=None, fp32_model=None, model_dir: str = BERT_ONNX_DIR):
+    from sentence_transformers import SentenceTransformer
+
+    fp32_model = fp32_model or SentenceTransformer(model_name)
+    onnx_model = onnx_model or load_onnx_model(model_name, model_dir=model_dir)
+    score = min_cosine(
+        fp32_model.encode(PROBE_TEXTS, convert_to_numpy=True),
+        onnx_model.encode(PROBE_TEXTS, convert_to_numpy=True),
+    )
+    result = {
+        "model": model_name,
+        "file_name": quantized_file(),
+        "min_cosine": round(score, 6),
+        "probe_texts": len(PROBE_TEXTS),
+    }
+    with open(os.path.join(model_dir, VALIDATION_FILE), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"[BERT ONNX] int8 vs fp32 minimum cosine similarity: {score:.4f} "
+          f"(threshold {BERT_ONNX_MIN_COSINE})")
+    return result
+
+
+# Exports the fp32 ONNX graph, quantizes it to int8 and validates it; no-op when already exported
+def export(model_name: str, model_dir: str = BERT_ONNX_DIR, force: bool = False):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    if not force and os.path.exists(os.path.join(model_dir, quantized_file())) and read_validation(model_dir):
+        return read_validation(model_dir)
+
+    print(f"[BERT ONNX] Exporting {model_name} to {model_dir} ({BERT_ONNX_QUANTIZATION} int8)")
+    os.makedirs(model_dir, exist_ok=True)
+    onnx_fp32 = SentenceTransformer(model_name, backend="onnx")
+    onnx_fp32.save(model_dir)
+    export_dynamic_quantized_onnx_model(onnx_fp32, BERT_ONNX_QUANTIZATION, model_dir)
+    return validate(model_name, model_dir=model_dir)
+
+
+# The int8 model if it is exported and passed the check, otherwise None (callers fall back to fp32).
+# Never exports: that takes minutes, so it runs from the CLI or at embed server start, not on a query
+def load_validated(model_name: str, threads: int = 0, model_dir: str = BERT_ONNX_DIR):
+    result = read_validation(model_dir)
+    if result is None or not os.path.exists(os.path.join(model_dir, quantized_file())):
+        print(f"[BERT ONNX] No int8 model in {model_dir} (python -m embedders.bert_onnx --export), "
+              "using PyTorch fp32")
+        return None
+    if result["min_cosine"] < BERT_ONNX_MIN_COSINE:
+        print(f"[BERT ONNX] int8 model below threshold ({result['min_cosine']:.4f} < "
+              f"{BERT_ONNX_MIN_COSINE}), using PyTorch fp32")
+        return None
+    return load_onnx_model(model_name, threads, model_dir)
+
+
+if __name__ == "__main__":
+    from embedders.bert_embedder import _BERT_MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Export and validate the int8 ONNX BERT model")
+    parser.add_argument("--export", action="store_true", help="export even if a model already exists")
+    parser.add_argument("--check", action="store_true", help="re-run the fp32 agreement check")
+    args = parser.parse_args()
+
+    if args.export or not read_validation():
+        export(_BERT_MODEL_NAME, force=args.export)
+    elif args.check:
+        validate(_BERT_MODEL_NAME)
+    else:
+        print(json.dumps(read_validation(), indent=2))
@@ -0,0 +1,183 @@
+"""Long-lived local embedding service: owns the BERT model and groups concurrent requests
+from all sessions into one forward pass. (Qwen needs no service: Ollama already holds the
+model once and qwen_embed batches its requests.)
+
+    python -m embedders.embed_server --port 8765 --max-batch 64 --max-wait-ms 10
+
+POST /embed {"model": "bert", "texts": [...]} -> {"embeddings": [[...], ...]}
+GET  /health -> models, batches run and average batch size
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import urllib.request
+import numpy as np
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EMBED_SERVER_HOST = os.getenv("EMBED_SERVER_HOST", "127.0.0.1")
+EMBED_SERVER_PORT = int(os.getenv("EMBED_SERVER_PORT", "8765"))
+MAX_BATCH = int(os.getenv("EMBED_SERVER_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.getenv("EMBED_SERVER_MAX_WAIT_MS", "10"))
+
+
+# Client side: embeddings for `texts` from a running service
+def request_embeddings(model: str, texts, url: str, timeout: float = 30.0):
+    body = json.dumps({"model": model, "texts": list(texts)}).encode("utf-8")
+    req = urllib.request.Request(
+        url.rstrip("/") + "/embed", data=body, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return np.asarray(json.loads(resp.read())["embeddings"], dtype=np.float32)
+
+
+class MicroBatcher:
+    """Collects texts from concurrent callers and runs them through `embed_fn` together.
+
+    A batch closes when it holds `max_batch` texts or `max_wait_ms` after its first request.
+    """
+
+    def __init__(self, embed_fn, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.texts = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True, name="micro-batcher").start()
+
+    def submit(self, texts):
+        fut = Future()
+        self._queue.put((list(texts), fut))
+        return fut.result()
+
+    def _run(self):
+        while True:
+            requests = [self._queue.get()]
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            texts = [t for request_texts, _ in requests for t in request_texts]
+            try:
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                for _, fut in requests:
+                    fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for request_texts, fut in requests:
+                fut.set_result(vectors[start:start + len(request_texts)])
+                start += len(request_texts)
+
+
+def _as_lists(vectors):
+    return vectors.tolist() if hasattr(vectors, "tolist") else [list(map(float, v)) for v in vectors]
+
+
+class EmbedServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Many sessions connect at once; the default backlog of 5 resets connections under load
+    request_queue_size = 128
+
+
+def make_handler(batchers: dict):
+
+    class EmbedHandler(BaseHTTPRequestHandler):
+
+        def _reply(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {
+                name: {
+                    "batches": b.batches,
+                    "texts": b.texts,
+                    "avg_batch": round(b.texts / b.batches, 2) if b.batches else 0,
+                }
+                for name, b in batchers.items()
+            })
+
+        def do_POST(self):
+            if self.path != "/embed":
+                return self._reply(404, {"error": "not found"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                batcher = batchers[body.get("model", "bert")]
+                texts = body["texts"]
+            except (KeyError, ValueError) as e:
+                return self._reply(400, {"error": f"bad request: {e}"})
+            try:
+                self._reply(200, {"embeddings": _as_lists(batcher.submit(texts))})
+            except Exception as e:
+                self._reply(500, {"error": str(e)})
+
+        # Keep the console for the [EMBED SERVER] lines
+        def log_message(self, format, *args):
+            pass
+
+    return EmbedHandler
+
+
+def serve(host: str = EMBED_SERVER_HOST, port: int = EMBED_SERVER_PORT, max_batch: int = MAX_BATCH,
+          max_wait_ms: float = MAX_WAIT_MS):
+    from embedders.bert_embedder import encode_local, BERT_RUNTIME, _BERT_MODEL_NAME
+
+    # The int8 export takes minutes; do it here, before serving, rather than on a query
+    if BERT_RUNTIME == "onnx":
+        try:
+            from embedders.bert_onnx import export
+            export(_BERT_MODEL_NAME)
+        except Exception as e:
+            print(f"[EMBED SERVER] ONNX export failed ({e}), BERT will run in PyTorch fp32")
+
+    batchers = {"bert": MicroBatcher(encode_local, max_batch, max_wait_ms)}
+
+    # Load the model before accepting requests
+    encode_local(["warmup"])
+
+    server = EmbedServer((host, port), make_handler(batchers))
+    print(f"[EMBED SERVER] Serving {', '.join(batchers)} on http://{host}:{port} "
+          f"(max batch {max_batch}, max wait {max_wait_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local embedding service with micro-batching")
+    parser.add_argument("--host", default=EMBED_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=EMBED_SERVER_PORT)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.max_batch, args.max_wait_ms)
@@ -0,0 +1,144 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+# On-disk embedding store keyed by (model, sha256(text)); vectors are float32 blobs
+EMBED_CACHE_PATH = os.getenv(
+    "EMBED_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "embeddings.sqlite")
+)
+# Least recently used vectors are evicted above this size; 0 disables the cache
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "512"))
+LOOKUP_BATCH = 500
+
+_local = threading.local()
+
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(EMBED_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(EMBED_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        # Running total of the stored vector bytes, so eviction does not have to scan the table
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta (key, value) "
+                "SELECT 'bytes', COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            )
+        _local.conn = conn
+    return conn
+
+
+def _hash(text: str):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Hits and misses of the current thread since the last reset (each ingest backend runs in its own thread)
+def reset_cache_stats():
+    _local.stats = {"hits": 0, "misses": 0}
+
+
+def cache_stats():
+    return dict(getattr(_local, "stats", {"hits": 0, "misses": 0}))
+
+
+def _count(hits: int, misses: int):
+    if not hasattr(_local, "stats"):
+        reset_cache_stats()
+    _local.stats["hits"] += hits
+    _local.stats["misses"] += misses
+
+
+def _evict(conn, added: int):
+    max_bytes = EMBED_CACHE_MAX_MB * 1024 * 1024
+    conn.execute("UPDATE cache_meta SET value = value + ? WHERE key = 'bytes'", (added,))
+    total = conn.execute("SELECT value FROM cache_meta WHERE key = 'bytes'").fetchone()[0]
+    if total <= max_bytes:
+        return
+
+    # Drop the oldest entries down to 90% so eviction does not run on every insert
+    excess = total - 0.9 * max_bytes
+    freed = 0
+    stale = []
+    for model, text_hash, size in conn.execute(
+        "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used"
+    ):
+        stale.append((model, text_hash))
+        freed += size
+        if freed >= excess:
+            break
+    conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", stale)
+    conn.execute("UPDATE cache_meta SET value = MAX(value - ?, 0) WHERE key = 'bytes'", (freed,))
+    print(f"[EMBED CACHE] Evicted {len(stale)} vectors ({freed / 1024 / 1024:.1f} MB)")
+
+
+def cached_embed(model: str, texts, embed_fn):
+    """Embed `texts` with `embed_fn`, reusing vectors stored for the same model and text.
+
+    Only the misses are sent to the model, in their original order. Returns a float32 (n, dim) array.
+    """
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    if EMBED_CACHE_MAX_MB <= 0:
+        return np.asarray(embed_fn(texts), dtype=np.float32)
+
+    conn = _connect()
+    hashes = [_hash(t) for t in texts]
+    unique_hashes = list(dict.fromkeys(hashes))
+
+    found = {}
+    for i in range(0, len(unique_hashes), LOOKUP_BATCH):
+        batch = unique_hashes[i:i + LOOKUP_BATCH]
+        rows = conn.execute(
+            f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+            [model, *batch]
+        ).fetchall()
+        for text_hash, blob in rows:
+            found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+
+    now = time.time()
+    missing = [h for h in unique_hashes if h not in found]
+    missing_set = set(missing)
+    if missing:
+        first_text = {}
+        for text, text_hash in zip(texts, hashes):
+            first_text.setdefault(text_hash, text)
+        vectors = embed_fn([first_text[h] for h in missing])
+        if len(vectors) != len(missing):
+            raise RuntimeError(f"{model} returned {len(vectors)} vectors for {len(missing)} texts")
+        for text_hash, vector in zip(missing, vectors):
+            found[text_hash] = np.asarray(vector, dtype=np.float32)
+
+    with conn:
+        # Another process may have stored the same text meanwhile; only new rows add to the total
+        inserted = conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(model, h, found[h].tobytes(), now) for h in missing]
+        ).rowcount if missing else 0
+        conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+            [(now, model, h) for h in unique_hashes if h not in missing_set]
+        )
+        if inserted:
+            _evict(conn, inserted * found[missing[0]].nbytes)
+
+    _count(hits=len(texts) - len(missing), misses=len(missing))
+    return np.stack([found[h] for h in hashes])
@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+from embedders.embedding_cache import cached_embed
+
+GEMINI_EMBED_MODEL = "text-embedding-004"
+GENAI_API_KEY = os.getenv("GENAI_API_KEY")
+# The embed API takes at most 100 texts per request; requests per minute are quota bound
+GEMINI_EMBED_BATCH = int(os.getenv("GEMINI_EMBED_BATCH", "100"))
+GEMINI_EMBED_RPM = float(os.getenv("GEMINI_EMBED_RPM", "100"))
+GEMINI_EMBED_CONCURRENCY = int(os.getenv("GEMINI_EMBED_CONCURRENCY", "4"))
+GEMINI_EMBED_RETRIES = int(os.getenv("GEMINI_EMBED_RETRIES", "4"))
+GEMINI_EMBED_BACKOFF = float(os.getenv("GEMINI_EMBED_BACKOFF_SECONDS", "2"))
+# Quota and server-side failures; google.api_core errors carry their HTTP status as `code`
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# GEMINI_EMBED_STUB=1 swaps the API for embedders.gemini_stub (offline runs and tests)
+GEMINI_EMBED_STUB = os.getenv("GEMINI_EMBED_STUB", "0") == "1"
+
+
+class TokenBucket:
+    """Allows `per_minute` requests per minute on average, with bursts of up to `burst`."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Only quota, server and connection failures are retried; a bad request or API key fails at once
+def _is_retryable(e):
+    code = getattr(e, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS
+    # OSError covers socket and requests connection failures
+    return isinstance(e, (OSError, TimeoutError))
+
+
+def _api_embed(batch):
+    import google.generativeai as genai
+    return genai.embed_content(model=GEMINI_EMBED_MODEL, content=batch)["embedding"]
+
+
+class GeminiEmbedClient:
+    """Splits texts into API-sized batches and embeds them concurrently under one rate limit.
+
+    Batches that failed with a retryable error are retried on their own with exponential backoff,
+    any other error fails the call at once; results keep input order in one float32 (n, dim) array.
+    """
+
+    def __init__(self, embed_fn=None, batch_size: int = GEMINI_EMBED_BATCH,
+                 concurrency: int = GEMINI_EMBED_CONCURRENCY, per_minute: float = GEMINI_EMBED_RPM,
+                 retries: int = GEMINI_EMBED_RETRIES, backoff: float = GEMINI_EMBED_BACKOFF):
+        self.embed_fn = embed_fn or _api_embed
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(per_minute, burst=concurrency)
+
+    def _embed_batch(self, batch):
+        self.bucket.acquire()
+        vectors = self.embed_fn(batch)
+        if len(vectors) != len(batch):
+            raise RuntimeError(f"Gemini returned {len(vectors)} vectors for {len(batch)} texts")
+        return vectors
+
+    def embed(self, texts):
+        texts = list(texts)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = [None] * len(batches)
+        pending = list(range(len(batches)))
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(batches))),
+                                thread_name_prefix="gemini-embed") as executor:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    delay = self.backoff * (2 ** (attempt - 1))
+                    print(f"[GEMINI] Retrying {len(pending)} failed batches in {delay:.1f}s")
+                    time.sleep(delay)
+
+                futures = {i: executor.submit(self._embed_batch, batches[i]) for i in pending}
+                failed = []
+                for i, fut in futures.items():
+                    try:
+                        results[i] = np.asarray(fut.result(), dtype=np.float32)
+                    except Exception as e:
+                        errors[i] = e
+                        failed.append(i)
+                permanent = [i for i in failed if not _is_retryable(errors[i])]
+                if permanent:
+                    raise RuntimeError(f"Gemini batch failed: {errors[permanent[0]]}") from errors[permanent[0]]
+                pending = failed
+                if not pending:
+                    break
+
+        if pending:
+            raise RuntimeError(f"{len(pending)} of {len(batches)} Gemini batches failed: {errors[pending[0]]}")
+        return np.concatenate(results) if results else np.empty((0, 0), dtype=np.float32)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            if GEMINI_EMBED_STUB:
+                from embedders.gemini_stub import FakeGeminiEmbed
+                _client = GeminiEmbedClient(embed_fn=FakeGeminiEmbed())
+            else:
+                import google.generativeai as genai
+                genai.configure(api_key=GENAI_API_KEY)
+                _client = GeminiEmbedClient()
+        return _client
+
+
+def gemini_embed(texts):
+    return cached_embed(GEMINI_EMBED_MODEL, texts, get_client().embed)
@@ -0,0 +1,88 @@
+"""Offline stand-in for the Gemini embed API.
+
+    python -m embedders.gemini_stub --texts 1000 --fail-rate 0.2
+
+Vectors are derived from a hash of the text, so the same text always gets the same
+vector. Requests fail at random with quota errors and oversized batches are rejected,
+like the real API. Running the module checks GeminiEmbedClient against it.
+"""
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Stands in for google.api_core's GoogleAPICallError, which carries the HTTP status as `code`
+class FakeAPIError(Exception):
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeGeminiEmbed:
+
+    def __init__(self, dim: int = 768, fail_rate: float = 0.0, max_batch: int = 100,
+                 latency: float = 0.0, seed: int = 0):
+        self.dim = dim
+        self.fail_rate = fail_rate
+        self.max_batch = max_batch
+        self.latency = latency
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def vector(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        v = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return (v / np.linalg.norm(v)).tolist()
+
+    def __call__(self, batch):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.fail_rate
+            if fail:
+                self.failures += 1
+        if len(batch) > self.max_batch:
+            raise FakeAPIError(400, f"at most {self.max_batch} requests can be in one batch")
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise FakeAPIError(429, "Resource has been exhausted (e.g. check quota).")
+        return [self.vector(t) for t in batch]
+
+
+def self_check(n_texts: int, fail_rate: float, concurrency: int, per_minute: float):
+    from embedders.gemini_embedder import GeminiEmbedClient
+
+    stub = FakeGeminiEmbed(fail_rate=fail_rate, latency=0.01)
+    client = GeminiEmbedClient(embed_fn=stub, concurrency=concurrency, per_minute=per_minute,
+                               retries=8, backoff=0.05)
+    texts = [f"Produkt {i} | Kategorie {i % 17} | REWE" for i in range(n_texts)]
+
+    start = time.time()
+    vectors = client.embed(texts)
+    elapsed = time.time() - start
+
+    assert len(vectors) == len(texts), "vector count differs"
+    assert all(np.array_equal(v, stub.vector(t)) for t, v in zip(texts, vectors)), "order not preserved"
+    print(f"{n_texts} texts in {elapsed:.2f}s: {stub.calls} requests, {stub.failures} failed and retried")
+    print("order preserved, all batches embedded")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check GeminiEmbedClient against the offline stub")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=6000)
+    args = parser.parse_args()
+
+    self_check(args.texts, args.fail_rate, args.concurrency, args.rpm)
@@ -1,77 +1,147 @@
 import ollama
-from qdrant_client import QdrantClient, models
 import os
+import numpy as np
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from embedders.embedding_cache import cached_embed
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
 QWEN_EMBED_MODEL = "qwen3-embedding:4b"
-QDRANT_URL = os.getenv("QDRANT_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+# Inputs per /api/embed request and requests in flight (match OLLAMA_NUM_PARALLEL on the server)
+QWEN_EMBED_BATCH = int(os.getenv("QWEN_EMBED_BATCH", "32"))
+QWEN_EMBED_CONCURRENCY = int(os.getenv("QWEN_EMBED_CONCURRENCY", "2"))
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+# Stored dimension: qwen3-embedding is Matryoshka-trained, so its first N dimensions (renormalized)
+# are an embedding on their own; 0 keeps the full 2560. Vector storage of offers_qwen:
+# "float32", "float16" (half the size) or "int8" (float16 on disk, search on int8 copies in RAM only)
+QWEN_EMBED_DIM = int(os.getenv("QWEN_EMBED_DIM", "0"))
+QWEN_VECTOR_STORAGE = os.getenv("QWEN_VECTOR_STORAGE", "float32")
 
-def embed_texts(texts):
-    vectors = []
-    for t in texts:
-        resp = ollama.embeddings(model=QWEN_EMBED_MODEL, prompt=t)
 
-        if "embedding" in resp:
-            vectors.append(resp["embedding"])
+# /api/embed answers {"embeddings": [[...], ...]}, the older /api/embeddings {"embedding": [...]}
+def _vectors(resp, expected: int):
+    if "embeddings" in resp and resp["embeddings"]:
+        vectors = list(resp["embeddings"])
+    elif "embedding" in resp and resp["embedding"]:
+        vectors = [resp["embedding"]]
+    else:
+        raise RuntimeError(f"Unexpected Ollama response: {resp}")
+    if len(vectors) != expected:
+        raise RuntimeError(f"Ollama returned {len(vectors)} vectors for {expected} texts")
+    return vectors
 
-        elif "embeddings" in resp:
-            vectors.append(resp["embeddings"][0])
 
-        else:
-            raise RuntimeError(f"Unexpected Ollama response: {resp}")
+class QwenEmbedClient:
+    """Batched Qwen embeddings through Ollama with a bounded number of requests in flight."""
 
-    return vectors
+    def __init__(self, model: str = QWEN_EMBED_MODEL, batch_size: int = QWEN_EMBED_BATCH,
+                 concurrency: int = QWEN_EMBED_CONCURRENCY, host: str = OLLAMA_HOST):
+        self.model = model
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.client = ollama.Client(host=host) if host else ollama.Client()
+        self.batch_endpoint = True
 
-def embed_one(text):
-    resp = ollama.embeddings(model=QWEN_EMBED_MODEL, prompt=text)
-    if "embedding" in resp:
-        return resp["embedding"]
-    return resp["embeddings"][0]
+    def _embed_batch(self, batch):
+        if self.batch_endpoint:
+            try:
+                return _vectors(self.client.embed(model=self.model, input=batch), len(batch))
+            except ollama.ResponseError as e:
+                # Servers older than the batch endpoint answer 404; fall back to one text per request
+                if e.status_code != 404:
+                    raise
+                print("[QWEN] Ollama has no /api/embed, falling back to per-text requests")
+                self.batch_endpoint = False
+        return [_vectors(self.client.embeddings(model=self.model, prompt=t), 1)[0] for t in batch]
+
+    def stream(self, texts):
+        """Yield the vectors of each batch in input order while later batches are in flight."""
+        texts = list(texts)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if not batches:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches)),
+                                thread_name_prefix="qwen-embed") as executor:
+            in_flight = deque()
+            remaining = iter(batches)
+            for batch in remaining:
+                in_flight.append(executor.submit(self._embed_batch, batch))
+                if len(in_flight) >= self.concurrency:
+                    break
+            while in_flight:
+                vectors = in_flight.popleft().result()
+                next_batch = next(remaining, None)
+                if next_batch is not None:
+                    in_flight.append(executor.submit(self._embed_batch, next_batch))
+                yield vectors
+
+    # Each batch becomes float32 as it arrives, so the JSON floats of only one batch are alive at a time
+    def embed(self, texts):
+        batches = [np.asarray(batch, dtype=np.float32) for batch in self.stream(texts)]
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = QwenEmbedClient()
+        return _client
 
+
+# First `dim` dimensions of each vector, rescaled to unit length
+def truncate_embeddings(vectors, dim: int):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not dim or dim >= vectors.shape[1]:
+        return vectors
+    vectors = vectors[:, :dim]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Batch entry point (ingest); the cache keeps full vectors, so changing QWEN_EMBED_DIM needs no re-embedding
 def qwen_embed(texts):
+    vectors = cached_embed(QWEN_EMBED_MODEL, texts, get_client().embed)
+    if not QWEN_EMBED_DIM or not len(vectors):
+        return vectors
+    return truncate_embeddings(vectors, QWEN_EMBED_DIM)
 
-    vectors = []
-    for t in texts:
-        resp = ollama.embeddings(model=QWEN_EMBED_MODEL, prompt=t)
 
-        if "embedding" in resp:
-            vectors.append(resp["embedding"])
-        elif "embeddings" in resp:
-            vectors.append(resp["embeddings"][0])
-        else:
-            raise RuntimeError(f"Unexpected embedding response: {resp}")
+# Search settings matching QWEN_VECTOR_STORAGE
+def qwen_search_params():
+    if QWEN_VECTOR_STORAGE != "int8":
+        return None
+    from qdrant_client import models
+    return models.SearchParams(quantization=models.QuantizationSearchParams(rescore=False))
 
-    return vectors
 
-def ensure_qwen_collection():
+# Single entry point (queries)
+def embed_one(text):
+    return qwen_embed([text])[0]
 
-    try:
-        qdrant.get_collection("offers_qwen")
-    except Exception:
-        test_dim = len(qwen_embed(["test"])[0])
-        qdrant.create_collection(
-            collection_name="offers_qwen",
-            vectors_config=models.VectorParams(size=test_dim, distance=models.Distance.COSINE)
-        )
 
+# Streaming entry point: vectors batch by batch without caching, for large one-off runs;
+# truncated like qwen_embed so they fit offers_qwen
+def iter_qwen_embeddings(texts):
+    for batch in get_client().stream(texts):
+        yield truncate_embeddings(batch, QWEN_EMBED_DIM)
+
+
+# Creation and settings live in scraping_engine.schema, shared with the other offer collections
+def ensure_qwen_collection():
+    from scraping_engine.schema import ensure_offer_collection, probe_dim
+    ensure_offer_collection("offers_qwen", probe_dim(qwen_embed), QWEN_VECTOR_STORAGE)
+
+# Batching, parallelism and retries are shared with the other collections (scraping_engine.upsert)
 def chunk_upsert(points, batch_size=100):
-    
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i+batch_size]
-        tries = 0
-        while tries < 2:
-            try:
-                qdrant.upsert("offers_qwen", batch)
-                break
-            except Exception as e:
-                if "timeout" in str(e).lower() and batch_size > 20 and tries == 0:
-                    batch_size = max(20, batch_size // 2)
-                    batch = points[i:i+batch_size]
-                    tries += 1
-                else:
-                    raise
\ No newline at end of file
+    from scraping_engine.upsert import upsert_points
+    upsert_points("offers_qwen", points, max_points=batch_size)
@@ -1,6 +1,6 @@
 import json
 import pandas as pd
-from qdrant_client import QdrantClient, models
+from qdrant_client import QdrantClient
 import sys
 import os
 from dotenv import load_dotenv
@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
 from embedders.bert_embedder import bert_embed
+from rag_engine.filters import offer_filter
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 
@@ -26,17 +27,8 @@ def perform_rag_bert(query: str, pincode: str) -> str:
         # Embed query with BERT
         qvec = bert_embed(query)[0]
 
-        # Filter by pincode
-        filter_cond = None
-        if pincode != "ALL":
-            filter_cond = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="pincode",
-                        match=models.MatchAny(any=["ALL", pincode])
-                    )
-                ]
-            )
+        # Filter by pincode and offer validity
+        filter_cond = offer_filter(pincode)
 
         # Search in offers_bert
         hits = qdrant.search(
@@ -0,0 +1,23 @@
+from datetime import datetime
+from qdrant_client import models
+
+
+# Offers for a pincode (or everywhere) that are valid right now.
+# Points written before validity tracking have no dates and are kept until the expiry job removes them.
+def offer_filter(pincode: str, now: datetime = None):
+    now = now or datetime.now()
+
+    must = [
+        models.Filter(should=[
+            models.FieldCondition(key="valid_until", range=models.DatetimeRange(gt=now)),
+            models.IsEmptyCondition(is_empty=models.PayloadField(key="valid_until")),
+        ]),
+        models.Filter(should=[
+            models.FieldCondition(key="valid_from", range=models.DatetimeRange(lte=now)),
+            models.IsEmptyCondition(is_empty=models.PayloadField(key="valid_from")),
+        ]),
+    ]
+    if pincode != "ALL":
+        must.append(models.FieldCondition(key="pincode", match=models.MatchAny(any=["ALL", pincode])))
+
+    return models.Filter(must=must)
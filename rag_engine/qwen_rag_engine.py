@@ -4,12 +4,14 @@ import re
 import os
 import sys
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
-from embedders.qwen_embedder import embed_one
+from qdrant_client import QdrantClient
+from embedders.qwen_embedder import qwen_embed, qwen_search_params
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
+from rag_engine.filters import offer_filter
+
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
@@ -73,17 +75,24 @@ def perform_rag_qwen(query: str, pincode: str) -> str:
         requested_items = [t.strip() for t in refined_query.split(',') if t.strip()] or [refined_query]
 
 
-        # Step 3: optional pincode filter
-        filter_cond = None
-        if pincode != "ALL":
-            filter_cond = models.Filter(must=[models.FieldCondition(key="pincode", match=models.MatchAny(any=["ALL", pincode]))])
+        # Step 3: pincode and validity filter
+        filter_cond = offer_filter(pincode)
+
+        # Step 4: vector search per item (all items embedded in one batched request)
+        try:
+            item_vectors = qwen_embed(requested_items)
+        except Exception as ee:
+            print(f"[QWEN RAG] Embedding failed: {ee}")
+            item_vectors = [None] * len(requested_items)
 
-        # Step 4: vector search per item
         per_item_candidates = {}
-        for item in requested_items:
+        for item, emb in zip(requested_items, item_vectors):
+            if emb is None:
+                per_item_candidates[item] = []
+                continue
             try:
-                emb = embed_one(item)
-                hits = qdrant.search(collection_name="offers_qwen", query_vector=emb, query_filter=filter_cond, limit=4)
+                hits = qdrant.search(collection_name="offers_qwen", query_vector=emb, query_filter=filter_cond,
+                                     search_params=qwen_search_params(), limit=4)
                 per_item_candidates[item] = [h.payload for h in hits]
             except Exception as se:
                 print(f"[QWEN RAG] Search failed for '{item}': {se}")
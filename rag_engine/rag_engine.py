@@ -1,9 +1,13 @@
 import json
 import os
+import sys
 from dotenv import load_dotenv
 import google.generativeai as genai
 from qdrant_client import QdrantClient
-from qdrant_client.http import models
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rag_engine.filters import offer_filter
+from embedders.gemini_embedder import gemini_embed
 
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
@@ -14,7 +18,6 @@ GENAI_API_KEY = os.getenv("GENAI_API_KEY")
 genai.configure(api_key=GENAI_API_KEY)
 qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
 
-EMBED_MODEL = "text-embedding-004"
 GEN_MODEL = "gemini-2.5-flash"
 
 
@@ -84,18 +87,23 @@ def perform_rag(query: str, pincode: str) -> str:
         refined_query = generate_search_query(query)
         requested_items = [t.strip() for t in refined_query.split(',') if t.strip()] or [refined_query]
 
-        # Step 3: build optional pincode filter
-        filter_cond = None
-        if pincode != "ALL":
-            filter_cond = models.Filter(must=[models.FieldCondition(
-                key="pincode", match=models.MatchAny(any=["ALL", pincode])
-            )])
+        # Step 3: pincode and validity filter
+        filter_cond = offer_filter(pincode)
 
         # Step 4: vector search per requested item (collect top 4 payloads)
+        # All items are embedded in one batched, cached call
+        try:
+            item_vectors = gemini_embed(requested_items)
+        except Exception as ee:
+            print(f"[RAG] Embedding failed: {ee}")
+            item_vectors = [None] * len(requested_items)
+
         per_item_candidates = {}
-        for item in requested_items:
+        for item, emb in zip(requested_items, item_vectors):
+            if emb is None:
+                per_item_candidates[item] = []
+                continue
             try:
-                emb = genai.embed_content(model=EMBED_MODEL, content=item)["embedding"]
                 hits = qdrant.search(
                     collection_name="offers",
                     query_vector=emb,
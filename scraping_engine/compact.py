@@ -0,0 +1,184 @@
+"""One-off compaction: merge duplicate points left by the old per-process hash IDs and
+the old price-keyed offer IDs. An offer keeps one point per pincode price (see _merge_offer).
+
+    python -m scraping_engine.compact --dry-run
+    python -m scraping_engine.compact offers offers_bert
+"""
+import os
+import sys
+import argparse
+from qdrant_client import QdrantClient, models
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+from cleaning.helpers import normalize_key, price_key
+from scraping_engine.ingestion import point_id
+from ui.pincode_manager import pincode_point_id
+
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+
+OFFER_COLLECTIONS = ["offers", "offers_bert", "offers_qwen"]
+BATCH_SIZE = 100
+
+
+def _scroll_payloads(collection: str):
+    offset = None
+    while True:
+        items, offset = qdrant.scroll(
+            collection_name=collection,
+            limit=500,
+            with_vectors=False,
+            offset=offset
+        )
+        yield from items
+        if offset is None:
+            break
+
+
+# Group points by the key they are merged on
+def _group(collection: str, group_key):
+    groups = {}
+    for pt in _scroll_payloads(collection):
+        try:
+            key = group_key(pt.payload)
+        except (KeyError, TypeError, ValueError):
+            print(f"[COMPACT] {collection}: skipping point {pt.id} with incomplete payload")
+            continue
+        groups.setdefault(key, []).append(pt)
+    return groups
+
+
+def _scraped_at(pt):
+    return pt.payload.get("scraped_at", "")
+
+
+def _offer_key(payload):
+    return normalize_key(payload["product_name"], payload["store_name"])
+
+
+# Same rules as ingestion: a pincode keeps only its latest price, each remaining price is one
+# point (ALL when seen under several pincodes). The latest price lives under the product ID,
+# every other price under its price-keyed ID. Returns {target ID: (payload, source point)}
+def _merge_offer(collection: str):
+    def merge(points):
+        newest = {}
+        for pt in sorted(points, key=_scraped_at):
+            newest[pt.payload.get("pincode")] = float(pt.payload["price"])
+        current = [
+            pt for pt in points
+            if pt.payload.get("pincode") == "ALL" or float(pt.payload["price"]) == newest[pt.payload.get("pincode")]
+        ]
+
+        by_price = {}
+        for pt in current:
+            by_price.setdefault(float(pt.payload["price"]), []).append(pt)
+        key = _offer_key(current[0].payload)
+        base_price = float(max(current, key=_scraped_at).payload["price"])
+
+        writes = {}
+        for price, group in by_price.items():
+            source = max(group, key=_scraped_at)
+            payload = dict(source.payload)
+            pincodes = {pt.payload.get("pincode") for pt in group}
+            payload["pincode"] = pincodes.pop() if len(pincodes) == 1 else "ALL"
+            target = point_id(key if price == base_price else price_key(key, price), collection)
+            writes[target] = (payload, source)
+        return writes
+    return merge
+
+
+def _merge_pincode(points):
+    latest = max(points, key=_scraped_at)
+    payload = dict(latest.payload)
+    payload["query_count"] = max(pt.payload.get("query_count", 0) for pt in points)
+    last_queried = [pt.payload["last_queried_at"] for pt in points if pt.payload.get("last_queried_at")]
+    if last_queried:
+        payload["last_queried_at"] = max(last_queried)
+    return {pincode_point_id(payload["pincode"]): (payload, latest)}
+
+
+# A group is compact when every point already sits under its own target and nothing is dropped
+def _compact(points, writes):
+    return len(points) == len(writes) and all(
+        str(source.id) == target for target, (_, source) in writes.items()
+    )
+
+
+def compact_collection(collection: str, group_key, merge, dry_run: bool = False):
+    groups = _group(collection, group_key)
+    total = sum(len(points) for points in groups.values())
+
+    todo = {}
+    for key, points in groups.items():
+        writes = merge(points)
+        if not _compact(points, writes):
+            todo[key] = (points, writes)
+    removed = sum(len(points) - len(writes) for points, writes in todo.values())
+    print(f"[COMPACT] {collection}: {total} points, {total - removed} unique, "
+          f"{len(todo)} to rewrite, {removed} to remove")
+    if dry_run or not todo:
+        return {"points": total, "unique": total - removed, "removed": 0}
+
+    keys = list(todo)
+    for i in range(0, len(keys), BATCH_SIZE):
+        batch = [todo[key] for key in keys[i:i + BATCH_SIZE]]
+        writes = {target: write for _, group_writes in batch for target, write in group_writes.items()}
+
+        # Reuse a stored vector instead of re-embedding
+        source_ids = list({str(source.id) for _, source in writes.values()})
+        vectors = {
+            str(pt.id): pt.vector
+            for pt in qdrant.retrieve(collection, ids=source_ids, with_payload=False, with_vectors=True)
+        }
+
+        points = [
+            models.PointStruct(id=target, vector=vectors[str(source.id)], payload=payload)
+            for target, (payload, source) in writes.items()
+        ]
+        qdrant.upsert(collection, points, wait=True)
+
+        # Delete only after the merged points are written, so an interrupted run loses nothing
+        stale = [pt.id for points, _ in batch for pt in points if str(pt.id) not in writes]
+        if stale:
+            qdrant.delete(collection, points_selector=models.PointIdsList(points=stale), wait=True)
+        print(f"[COMPACT] {collection}: {min(i + BATCH_SIZE, len(keys))}/{len(keys)} rewritten")
+
+    return {"points": total, "unique": total - removed, "removed": removed}
+
+
+def compact_offers(collection: str, dry_run: bool = False):
+    return compact_collection(collection, _offer_key, _merge_offer(collection), dry_run)
+
+
+def compact(collections=None, dry_run: bool = False):
+    collections = collections or OFFER_COLLECTIONS + ["pincodes"]
+    existing = {c.name for c in qdrant.get_collections().collections}
+
+    results = {}
+    for collection in collections:
+        if collection not in existing:
+            print(f"[COMPACT] {collection}: collection missing, skipped")
+            continue
+        if collection == "pincodes":
+            results[collection] = compact_collection(
+                collection, lambda payload: payload["pincode"], _merge_pincode, dry_run
+            )
+        else:
+            results[collection] = compact_offers(collection, dry_run)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate offer and pincode points")
+    parser.add_argument("collections", nargs="*", help=f"default: {' '.join(OFFER_COLLECTIONS + ['pincodes'])}")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args()
+    unknown = set(args.collections) - set(OFFER_COLLECTIONS + ["pincodes"])
+    if unknown:
+        parser.error(f"unknown collections: {', '.join(sorted(unknown))}")
+
+    compact(args.collections or None, dry_run=args.dry_run)
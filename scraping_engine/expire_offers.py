@@ -0,0 +1,79 @@
+"""Delete offers whose validity window has ended, in batches.
+
+    python -m scraping_engine.expire_offers --dry-run
+    python -m scraping_engine.expire_offers --include-undated
+
+The job runner calls expire_all() periodically, which keeps the offer collections
+at roughly one promotion week of data.
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+from qdrant_client import models
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping_engine.ingestion import qdrant
+
+OFFER_COLLECTIONS = ["offers", "offers_bert", "offers_qwen"]
+DELETE_BATCH = int(os.getenv("EXPIRE_DELETE_BATCH", "1000"))
+
+
+def _expired_filter(now: datetime, include_undated: bool):
+    should = [models.FieldCondition(key="valid_until", range=models.DatetimeRange(lte=now))]
+    # Points from before validity tracking never expire on their own
+    if include_undated:
+        should.append(models.IsEmptyCondition(is_empty=models.PayloadField(key="valid_until")))
+    return models.Filter(should=should)
+
+
+def expire_collection(collection: str, now: datetime = None, include_undated: bool = False, dry_run: bool = False):
+    now = now or datetime.now()
+    expired = _expired_filter(now, include_undated)
+
+    total = qdrant.count(collection, count_filter=expired, exact=True).count
+    print(f"[EXPIRE] {collection}: {total} expired points")
+    if dry_run or not total:
+        return 0
+
+    deleted = 0
+    while True:
+        # Deleted points leave the filter, so every page starts from the beginning
+        items, _ = qdrant.scroll(
+            collection_name=collection,
+            scroll_filter=expired,
+            limit=DELETE_BATCH,
+            with_payload=False,
+            with_vectors=False
+        )
+        if not items:
+            break
+        qdrant.delete(
+            collection_name=collection,
+            points_selector=models.PointIdsList(points=[pt.id for pt in items]),
+            wait=True
+        )
+        deleted += len(items)
+        print(f"[EXPIRE] {collection}: deleted {deleted}/{total}")
+
+    return deleted
+
+
+def expire_all(include_undated: bool = False, dry_run: bool = False):
+    existing = {c.name for c in qdrant.get_collections().collections}
+    return {
+        collection: expire_collection(collection, include_undated=include_undated, dry_run=dry_run)
+        for collection in OFFER_COLLECTIONS
+        if collection in existing
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete expired offers")
+    parser.add_argument("--include-undated", action="store_true",
+                        help="also delete points written before validity tracking")
+    parser.add_argument("--dry-run", action="store_true", help="only count expired points")
+    args = parser.parse_args()
+
+    expire_all(include_undated=args.include_undated, dry_run=args.dry_run)
@@ -0,0 +1,258 @@
+import os
+import sys
+import time
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Callable, List
+from concurrent.futures import ThreadPoolExecutor
+from qdrant_client import QdrantClient, models
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+from embedders.embedding_cache import reset_cache_stats, cache_stats
+from cleaning.helpers import clean_price_series, build_unique_key_series, price_key, stable_id
+from scraping_engine.schema import ensure_offer_collection, collection_dim
+from scraping_engine.upsert import VectorBatch, upsert_points
+from supermarket_scrapers.scrape_cache import promotion_week, week_start, week_expiry
+
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+
+# Version of the embedded document format, stored on every point (see migrate_etl_v2)
+ETL_VERSION = 2
+# IDs per retrieve call when checking which incoming offers already exist
+RETRIEVE_BATCH = int(os.getenv("INGEST_RETRIEVE_BATCH", "256"))
+# Payload updates per batch_update_points request (one per distinct new price)
+UPDATE_BATCH = 500
+
+
+@dataclass
+class Backend:
+    """One embedding model and the Qdrant collection it writes to."""
+    name: str
+    collection: str
+    embed: Callable[[List[str]], list]
+    embed_batch_size: int = 100
+    # Vector storage of the collection (see scraping_engine.schema.STORAGE_DATATYPES)
+    storage: str = "float32"
+    # One ingest at a time per backend so its model / API quota is never hit twice at once
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    # One float32 (n, dim) array for all texts
+    def embed_texts(self, texts):
+        chunks = [
+            np.asarray(self.embed(texts[i:i + self.embed_batch_size]), dtype=np.float32)
+            for i in range(0, len(texts), self.embed_batch_size)
+        ]
+        return np.concatenate(chunks) if chunks else np.empty((0, 0), dtype=np.float32)
+
+    def upsert_points(self, points):
+        upsert_points(self.collection, points)
+
+
+# Clean prices, drop unusable rows and build the dedupe key and embedding text, once for all backends
+def prepare_offers(df: pd.DataFrame):
+    df = df.copy()
+    df["price"] = clean_price_series(df["price"])
+    df = df.dropna(subset=["product_name", "price"])
+    df = df[df["product_name"].str.strip() != ""]
+    df["unique_key"] = build_unique_key_series(df)
+    # One point per product and store; a product listed twice keeps its first price
+    df = df.drop_duplicates("unique_key")
+    df["pagecontent"] = embedding_text(df)
+    return df
+
+
+# etl_version 2: only stable product fields are embedded, price and pincode live in the payload,
+# so a price change or another pincode reuses the cached vector of the same text
+def embedding_text(df: pd.DataFrame):
+    return (
+        df["product_name"].astype(str)
+        + " | " + df["category"].astype(str)
+        + " | " + df["store_name"].astype(str)
+    )
+
+
+# Deterministic point ID, so an offer maps to the same point in every run and process
+def point_id(unique_key: str, collection: str):
+    return stable_id(collection, unique_key)
+
+
+# Pincode and price of every incoming ID that already exists, looked up in batches instead of scrolling
+def fetch_existing(collection: str, ids: list):
+    existing = {}
+    for i in range(0, len(ids), RETRIEVE_BATCH):
+        points = qdrant.retrieve(
+            collection_name=collection,
+            ids=ids[i:i + RETRIEVE_BATCH],
+            with_payload=["pincode", "price"],
+            with_vectors=False
+        )
+        for pt in points:
+            existing[str(pt.id)] = pt.payload
+    return existing
+
+
+# An offer stored at another price for another pincode (or ALL) keeps that point; this pincode
+# gets its own point keyed by its price, so no pincode is shown another pincode's price.
+# Returns df with those rows re-pointed and `existing` extended with the price-keyed points
+def separate_prices(df: pd.DataFrame, existing: dict, pincode: str, collection: str):
+    stored = df["point_id"].map(existing)
+    stored_price = stored.map(lambda p: p.get("price"), na_action="ignore").astype(float)
+    stored_pincode = stored.map(lambda p: p.get("pincode"), na_action="ignore")
+    elsewhere = stored.notna() & (stored_price != df["price"].astype(float)) & (stored_pincode != pincode)
+    if not elsewhere.any():
+        return df, existing
+
+    df = df.copy()
+    df.loc[elsewhere, "point_id"] = [
+        point_id(price_key(key, price), collection)
+        for key, price in zip(df.loc[elsewhere, "unique_key"], df.loc[elsewhere, "price"])
+    ]
+    return df, {**existing, **fetch_existing(collection, df.loc[elsewhere, "point_id"].unique().tolist())}
+
+
+# Existing offers of this pincode whose price changed, grouped by new price: {price: [point ids]}
+def price_changes(df: pd.DataFrame, existing: dict):
+    stored = df["point_id"].map(lambda pid: existing[pid].get("price") if pid in existing else None)
+    changed = df[stored.notna() & (stored.astype(float) != df["price"].astype(float))]
+    return {float(price): ids.tolist() for price, ids in changed.groupby("price")["point_id"]}
+
+
+# SPLIT INTO NEW + UPDATE
+# An offer stored for another pincode is promoted to "ALL"; one stored for this pincode
+# (a re-scrape of the same pincode) stays as it is
+def diff_offers(df: pd.DataFrame, existing: dict, pincode: str):
+    known = df["point_id"].map(existing)
+    is_existing = df["point_id"].isin(existing.keys())
+
+    new_df = df[~is_existing]
+    update_ids = df.loc[is_existing & (known != "ALL") & (known != pincode), "point_id"].unique().tolist()
+    return new_df, update_ids
+
+
+# Offers are valid for the promotion week they were scraped in (the scrapers expose no dates)
+def offer_validity(now: datetime = None):
+    now = now or datetime.now()
+    week = promotion_week(now)
+    return {
+        "valid_from": week_start(week).isoformat(),
+        "valid_until": week_expiry(week).isoformat(),
+        "scraped_at": now.isoformat(timespec="seconds"),
+    }
+
+
+# Points built column by column; payload field order matches what older runs wrote.
+# The vectors stay one array until each upsert batch is sent
+def build_batch(new_df: pd.DataFrame, vectors: np.ndarray, pincode: str, validity: dict):
+    payloads = pd.DataFrame({
+        "category": new_df["category"],
+        "product_name": new_df["product_name"],
+        "price": new_df["price"].astype(float),
+        "pincode": pincode,
+        "store_name": new_df["store_name"],
+        "product_url": new_df["product_url"] if "product_url" in new_df else None,
+        "etl_version": ETL_VERSION,
+        **validity,
+    }).to_dict("records")
+
+    return VectorBatch(new_df["point_id"].tolist(), vectors, payloads)
+
+
+def sync_backend(backend: Backend, df: pd.DataFrame, pincode: str, validity: dict):
+    start_time = time.time()
+
+    with backend.lock:
+        reset_cache_stats()
+
+        df = df.assign(point_id=[point_id(k, backend.collection) for k in df["unique_key"]])
+        # A missing collection is created below, sized by the first embedded batch
+        existing = {}
+        size = collection_dim(backend.collection)
+        if size is not None:
+            # Adds the payload indexes an older collection is missing
+            ensure_offer_collection(backend.collection, size, backend.storage)
+            existing = fetch_existing(backend.collection, list(dict.fromkeys(df["point_id"])))
+            df, existing = separate_prices(df, existing, pincode, backend.collection)
+        seen = [pid for pid in dict.fromkeys(df["point_id"]) if pid in existing]
+        new_df, update_ids = diff_offers(df, {pid: p.get("pincode") for pid, p in existing.items()}, pincode)
+        repriced = price_changes(df, existing)
+        print(f"[{backend.name}] New items: {len(new_df)} | Update to ALL: {len(update_ids)} | "
+              f"Price changes: {sum(len(ids) for ids in repriced.values())}")
+
+        # Offers seen again stay valid through this week; valid_from keeps the first sighting
+        if seen:
+            qdrant.set_payload(
+                collection_name=backend.collection,
+                payload={"valid_until": validity["valid_until"], "scraped_at": validity["scraped_at"]},
+                points=seen
+            )
+
+        # A new price is a payload update of the existing point
+        operations = [
+            models.SetPayloadOperation(set_payload=models.SetPayload(payload={"price": price}, points=ids))
+            for price, ids in repriced.items()
+        ]
+        for i in range(0, len(operations), UPDATE_BATCH):
+            qdrant.batch_update_points(
+                collection_name=backend.collection,
+                update_operations=operations[i:i + UPDATE_BATCH]
+            )
+
+        # UPDATE EXISTING TO ALL
+        if update_ids:
+            qdrant.set_payload(
+                collection_name=backend.collection,
+                payload={"pincode": "ALL"},
+                points=update_ids
+            )
+
+        # INGEST NEW ITEMS
+        if not new_df.empty:
+            texts = new_df["pagecontent"].tolist()
+            print(f"[{backend.name}] Embedding {len(texts)} vectors...")
+            vectors = backend.embed_texts(texts)
+            ensure_offer_collection(backend.collection, vectors.shape[1], backend.storage)
+
+            batch = build_batch(new_df, vectors, pincode, validity)
+            backend.upsert_points(batch)
+            print(f"[{backend.name}] Upserted {len(batch)} items")
+
+        stats = cache_stats()
+
+    looked_up = stats["hits"] + stats["misses"]
+    if looked_up:
+        print(f"[{backend.name}] Embedding cache: {stats['hits']}/{looked_up} hits ({stats['hits'] / looked_up:.0%})")
+    print(f"[{backend.name}] ingestion DONE in {time.time() - start_time:.2f}s")
+    return len(new_df)
+
+
+def ingest_offers(df: pd.DataFrame, pincode: str, backends: List[Backend]):
+    """Clean once, then embed and write every backend's collection in parallel.
+
+    All backends run to completion even if one fails; failures are raised together at the end.
+    """
+    offers = prepare_offers(df)
+    if offers.empty:
+        return {}
+    validity = offer_validity()
+
+    results = {}
+    failures = {}
+    with ThreadPoolExecutor(max_workers=len(backends), thread_name_prefix="ingest") as executor:
+        futures = {executor.submit(sync_backend, b, offers, pincode, validity): b for b in backends}
+        for fut, backend in futures.items():
+            try:
+                results[backend.name] = fut.result()
+            except Exception as e:
+                failures[backend.name] = str(e)
+
+    if failures:
+        raise Exception("; ".join(f"{name} ingestion failed: {err}" for name, err in failures.items()))
+    return results
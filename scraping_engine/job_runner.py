@@ -0,0 +1,296 @@
+"""Background scrape jobs: a persisted queue, worker processes, popular-pincode prefetch and offer expiry.
+
+    python -m scraping_engine.job_runner run --workers 2
+    python -m scraping_engine.job_runner enqueue 10115 20095
+    python -m scraping_engine.job_runner status
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import multiprocessing
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dotenv import load_dotenv
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+JOBS_DB = os.getenv(
+    "SCRAPE_JOBS_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "jobs.sqlite")
+)
+MAX_ATTEMPTS = int(os.getenv("SCRAPE_JOB_MAX_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("SCRAPE_JOB_RETRY_BASE", "60"))
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "3600"))
+PREFETCH_TOP_N = int(os.getenv("PREFETCH_TOP_N", "20"))
+EXPIRE_INTERVAL = float(os.getenv("EXPIRE_INTERVAL_SECONDS", "21600"))
+POLL_SECONDS = 2.0
+
+
+# --------------------------------------------------
+# Persisted job queue (SQLite, safe across processes)
+# --------------------------------------------------
+
+def _connect():
+    os.makedirs(os.path.dirname(JOBS_DB), exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pincode TEXT NOT NULL,
+            reason TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_after REAL NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            last_error TEXT,
+            num_products INTEGER,
+            worker_pid INTEGER
+        )
+    """)
+    # Databases created before jobs recorded their worker
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if "worker_pid" not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+    return conn
+
+
+def enqueue(pincode: str, reason: str = "manual"):
+    """Queue a refresh for `pincode` unless one is already queued or running."""
+    now = datetime.now().isoformat()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        busy = conn.execute(
+            "SELECT id FROM jobs WHERE pincode = ? AND status IN ('queued', 'running')", (pincode,)
+        ).fetchone()
+        if busy:
+            conn.execute("COMMIT")
+            return None
+        cur = conn.execute(
+            "INSERT INTO jobs (pincode, reason, status, run_after, created_at, updated_at) "
+            "VALUES (?, ?, 'queued', ?, ?, ?)",
+            (pincode, reason, time.time(), now, now)
+        )
+        conn.execute("COMMIT")
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def _claim(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    job = conn.execute(
+        "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY run_after LIMIT 1",
+        (time.time(),)
+    ).fetchone()
+    if job:
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker_pid = ?, updated_at = ? WHERE id = ?",
+            (os.getpid(), datetime.now().isoformat(), job["id"])
+        )
+    conn.execute("COMMIT")
+    return job
+
+
+def _finish(conn, job, error: str = None, num_products: int = None):
+    now = datetime.now().isoformat()
+    if error is None:
+        conn.execute(
+            "UPDATE jobs SET status = 'done', num_products = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+            (num_products, now, job["id"])
+        )
+    elif job["attempts"] + 1 < MAX_ATTEMPTS:
+        # Exponential backoff; the scrape cache makes a retry skip stores that already succeeded
+        delay = RETRY_BASE_SECONDS * (2 ** job["attempts"])
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', run_after = ?, last_error = ?, updated_at = ? WHERE id = ?",
+            (time.time() + delay, error, now, job["id"])
+        )
+    else:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE id = ?",
+            (error, now, job["id"])
+        )
+
+
+def _pid_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Running jobs of a worker that died go back to the queue, or fail once out of attempts
+def _requeue_worker(conn, pid: int):
+    conn.execute(
+        "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+        "last_error = 'worker exited', updated_at = ? WHERE status = 'running' AND worker_pid = ?",
+        (MAX_ATTEMPTS, datetime.now().isoformat(), pid)
+    )
+
+
+# Jobs left 'running' by a crashed runner; jobs of a live worker (e.g. a second runner) are kept
+def _requeue_orphans(conn):
+    rows = conn.execute("SELECT DISTINCT worker_pid FROM jobs WHERE status = 'running'").fetchall()
+    for row in rows:
+        pid = row["worker_pid"]
+        if pid is None:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running' AND worker_pid IS NULL",
+                (datetime.now().isoformat(),)
+            )
+        elif not _pid_alive(pid):
+            _requeue_worker(conn, pid)
+
+
+# --------------------------------------------------
+# Workers
+# --------------------------------------------------
+
+def _worker(worker_id: int, stop):
+    # Imported here so every worker process builds its own browsers and clients
+    from scraping_engine.pipeline import refresh_pincode
+    from supermarket_scrapers.base import get_scrapers
+
+    # Start Chrome and accept the cookie banners now, so the first job does not pay for it
+    for store, scraper in get_scrapers().items():
+        try:
+            scraper.pool().warm()
+        except Exception as e:
+            print(f"[JOBS] worker {worker_id}: could not warm {store} browser: {e}")
+
+    conn = _connect()
+    while not stop.is_set():
+        job = _claim(conn)
+        if job is None:
+            stop.wait(POLL_SECONDS)
+            continue
+
+        print(f"[JOBS] worker {worker_id}: refreshing {job['pincode']} (attempt {job['attempts'] + 1})")
+        try:
+            result = refresh_pincode(job["pincode"])
+            error = f"partial scrape: {result['errors']}" if result["errors"] else None
+            _finish(conn, job, error=error, num_products=result["num_products"])
+        except Exception as e:
+            print(f"[JOBS] worker {worker_id}: {job['pincode']} failed: {e}")
+            _finish(conn, job, error=str(e))
+    conn.close()
+
+
+# --------------------------------------------------
+# Prefetch of popular pincodes
+# --------------------------------------------------
+
+# Queue the most-queried pincodes whose offers predate the current promotion week,
+# or whose partial scrape is due for a retry
+def schedule_prefetch(top_n: int = PREFETCH_TOP_N):
+    from ui.pincode_manager import get_popular_pincodes
+
+    queued = []
+    for entry in get_popular_pincodes(limit=top_n):
+        if entry["fresh"]:
+            continue
+        if enqueue(entry["pincode"], reason="prefetch"):
+            queued.append(entry["pincode"])
+
+    if queued:
+        print(f"[JOBS] Prefetch queued: {', '.join(queued)}")
+    return queued
+
+
+def run(workers: int = 1, prefetch: bool = True, expire: bool = True):
+    conn = _connect()
+    _requeue_orphans(conn)
+    conn.close()
+
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    procs = [
+        ctx.Process(target=_worker, args=(i, stop), name=f"scrape-worker-{i}")
+        for i in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    print(f"[JOBS] Started {workers} workers, jobs db: {JOBS_DB}")
+
+    next_prefetch = 0.0
+    next_expire = 0.0
+    try:
+        while True:
+            if prefetch and time.time() >= next_prefetch:
+                try:
+                    schedule_prefetch()
+                except Exception as e:
+                    print(f"[JOBS] Prefetch failed: {e}")
+                next_prefetch = time.time() + PREFETCH_INTERVAL
+
+            # Delete offers whose promotion week is over so the collections stay bounded
+            if expire and time.time() >= next_expire:
+                try:
+                    from scraping_engine.expire_offers import expire_all
+                    expire_all()
+                except Exception as e:
+                    print(f"[JOBS] Expiry failed: {e}")
+                next_expire = time.time() + EXPIRE_INTERVAL
+
+            # Replace workers that died (e.g. Chrome took the process down) and requeue their job
+            for i, proc in enumerate(procs):
+                if not proc.is_alive():
+                    print(f"[JOBS] worker {i} exited, restarting")
+                    conn = _connect()
+                    _requeue_worker(conn, proc.pid)
+                    conn.close()
+                    procs[i] = ctx.Process(target=_worker, args=(i, stop), name=f"scrape-worker-{i}")
+                    procs[i].start()
+
+            time.sleep(POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("[JOBS] Stopping workers...")
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=60)
+
+
+def status(limit: int = 20):
+    conn = _connect()
+    rows = conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    for row in rows:
+        print(
+            f"#{row['id']} {row['pincode']} {row['status']} ({row['reason']}) "
+            f"attempts={row['attempts']} products={row['num_products']} error={row['last_error'] or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background scrape job runner")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="start workers, the popular-pincode prefetch and offer expiry")
+    run_cmd.add_argument("--workers", type=int, default=1)
+    run_cmd.add_argument("--no-prefetch", action="store_true")
+    run_cmd.add_argument("--no-expire", action="store_true")
+
+    enqueue_cmd = sub.add_parser("enqueue", help="queue pincodes for a refresh")
+    enqueue_cmd.add_argument("pincodes", nargs="+")
+
+    sub.add_parser("status", help="show recent jobs")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(workers=args.workers, prefetch=not args.no_prefetch, expire=not args.no_expire)
+    elif args.command == "enqueue":
+        for pin in args.pincodes:
+            job_id = enqueue(pin)
+            print(f"{pin}: {'queued as #' + str(job_id) if job_id else 'already queued'}")
+    else:
+        status()
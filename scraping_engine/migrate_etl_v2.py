@@ -0,0 +1,92 @@
+"""Re-embed points written before etl_version 2 with the price- and pincode-free text.
+
+    python -m scraping_engine.migrate_etl_v2 --dry-run
+    python -m scraping_engine.migrate_etl_v2 BERT Qwen
+
+Vectors are replaced in place; IDs and payloads other than etl_version are untouched.
+Offers that differ only in price or pincode share one text, so the embedding cache
+sends each product to the model once. Afterwards the per-price duplicates of each
+product and store are merged, one point per pincode price (scraping_engine.compact).
+"""
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from qdrant_client import models
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraping_engine.ingestion import qdrant, ETL_VERSION, embedding_text
+from scraping_engine.compact import compact_offers
+
+BATCH_SIZE = 200
+
+
+def _backends():
+    # Imported lazily: loading a backend loads its model
+    from scraping_engine.scraper_engine import GEMINI_BACKEND
+    from scraping_engine.bert_scraper_engine import BERT_BACKEND
+    from scraping_engine.qwen_scraper_engine import QWEN_BACKEND
+    return {b.name: b for b in [GEMINI_BACKEND, BERT_BACKEND, QWEN_BACKEND]}
+
+
+def _outdated_filter():
+    return models.Filter(
+        must_not=[models.FieldCondition(key="etl_version", match=models.MatchValue(value=ETL_VERSION))]
+    )
+
+
+def migrate_backend(backend, dry_run: bool = False):
+    start_time = time.time()
+    outdated = qdrant.count(backend.collection, count_filter=_outdated_filter(), exact=True).count
+    print(f"[MIGRATE] {backend.collection}: {outdated} points below etl_version {ETL_VERSION}")
+
+    migrated = 0
+    while outdated and not dry_run:
+        # Migrated points leave the filter, so every page starts from the beginning
+        items, _ = qdrant.scroll(
+            collection_name=backend.collection,
+            scroll_filter=_outdated_filter(),
+            limit=BATCH_SIZE,
+            with_vectors=False
+        )
+        if not items:
+            break
+
+        df = pd.DataFrame([pt.payload for pt in items])
+        vectors = backend.embed_texts(embedding_text(df).tolist())
+
+        qdrant.update_vectors(
+            collection_name=backend.collection,
+            points=[models.PointVectors(id=pt.id, vector=vector) for pt, vector in zip(items, vectors.tolist())],
+            wait=True
+        )
+        qdrant.set_payload(
+            collection_name=backend.collection,
+            payload={"etl_version": ETL_VERSION},
+            points=[pt.id for pt in items],
+            wait=True
+        )
+        migrated += len(items)
+        print(f"[MIGRATE] {backend.collection}: {migrated}/{outdated}")
+
+    # Vectors no longer depend on the price, so the merged point can keep any of them
+    compact_offers(backend.collection, dry_run=dry_run)
+    print(f"[MIGRATE] {backend.collection}: done in {time.time() - start_time:.2f}s")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate offer points to the current etl_version")
+    parser.add_argument("backends", nargs="*", help="Gemini, BERT and/or Qwen (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="only count outdated points")
+    args = parser.parse_args()
+
+    backends = _backends()
+    unknown = set(args.backends) - set(backends)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    for name in args.backends or backends:
+        migrate_backend(backends[name], dry_run=args.dry_run)
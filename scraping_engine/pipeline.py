@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supermarket_scrapers.orchestrator import iter_all_offers
+from scraping_engine.stream_ingest import ingest_stream
+from scraping_engine.ingestion import ingest_offers
+from scraping_engine.scraper_engine import GEMINI_BACKEND
+from scraping_engine.bert_scraper_engine import BERT_BACKEND
+from scraping_engine.qwen_scraper_engine import QWEN_BACKEND
+from ui.pincode_manager import update_pincode_registry
+
+BACKENDS = [GEMINI_BACKEND, BERT_BACKEND, QWEN_BACKEND]
+
+
+# Clean once, then embed into all three collections in parallel
+def ingest_all(df, pincode: str):
+    return ingest_offers(df, pincode, BACKENDS)
+
+
+# Scrape all stores for a pincode, ingest into every collection and register the pincode.
+# Shared by the Streamlit UI and the background job runner.
+def refresh_pincode(pincode: str):
+    start_time = time.time()
+
+    # Offers are embedded and upserted per micro-batch while later categories are still scrolling
+    scrape_errors = {}
+    total = ingest_stream(
+        iter_all_offers(pincode, errors=scrape_errors),
+        pincode,
+        [ingest_all]
+    )
+    if total == 0:
+        raise Exception(f"No offers scraped: {scrape_errors}")
+    if scrape_errors:
+        print(f"[PIPELINE] Partial scrape for {pincode}, missing stores: {scrape_errors}")
+
+    # A partial scrape is registered with a retry time, so the missing stores are retried
+    # later instead of on every query (stores that succeeded come from the scrape cache)
+    update_pincode_registry(pincode, num_products=total, store_errors=scrape_errors)
+    print(f"[PIPELINE] Pincode registry updated for {pincode}")
+
+    print(f"[PIPELINE] {pincode}: {total} items in {time.time() - start_time:.2f}s")
+    return {"pincode": pincode, "num_products": total, "errors": scrape_errors}
@@ -1,5 +1,4 @@
 import pandas as pd
-from qdrant_client import QdrantClient, models
 import sys
 import os
 from dotenv import load_dotenv
@@ -7,116 +6,20 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
-from cleaning.helpers import clean_price, build_unique_key
-from embedders.qwen_embedder import qwen_embed, ensure_qwen_collection, chunk_upsert
+from embedders.qwen_embedder import qwen_embed, QWEN_VECTOR_STORAGE
+from scraping_engine.ingestion import Backend, ingest_offers
 
-QDRANT_URL = os.getenv("QDRANT_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
-qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+# Local Ollama server; the Qwen client batches requests and keeps a few in flight,
+# and the backend lock keeps it to one ingest at a time
+QWEN_BACKEND = Backend(
+    name="Qwen",
+    collection="offers_qwen",
+    embed=qwen_embed,
+    embed_batch_size=int(os.getenv("QWEN_INGEST_CHUNK", "512")),
+    storage=QWEN_VECTOR_STORAGE,
+)
 
 
 # INGESTION INTO offers_qwen collection
 def ingest_qwen(df: pd.DataFrame, pincode: str):
-   
-    try:
-        ensure_qwen_collection()
-        df["price"] = df["price"].apply(clean_price)
-        df = df.dropna(subset=["product_name", "price"])
-        df = df[df["product_name"].str.strip() != ""]
-        df["unique_key"] = df.apply(build_unique_key, axis=1)
-
-
-        
-        existing = []
-        offset = None
-
-        while True:
-            items, offset = qdrant.scroll(
-                collection_name="offers_qwen",
-                limit=200,
-                with_vectors=False,
-                offset=offset
-            )
-            if not items:
-                break
-
-            existing.extend(items)
-
-            if offset is None:
-                break
-
-        existing_map = {
-            f"{pt.payload['product_name']}_{pt.payload['store_name']}_{pt.payload['price']}":
-                {"id": pt.id, "pincode": pt.payload["pincode"]}
-            for pt in existing
-        }
-
-        # SPLIT INTO NEW + UPDATE
-
-        new_rows = []
-        update_ids = []
-
-        for _, row in df.iterrows():
-            key = row["unique_key"]
-            if key in existing_map:
-                if existing_map[key]["pincode"] != "ALL":
-                    update_ids.append(existing_map[key]["id"])
-            else:
-                new_rows.append(row)
-
-
-        # UPDATE EXISTING TO ALL
-
-        if update_ids:
-            qdrant.set_payload(
-                collection_name="offers_qwen",
-                payload={"pincode": "ALL"},
-                points=update_ids
-            )
-
-
-        # INGEST NEW ITEMS
-
-        if new_rows:
-            new_df = pd.DataFrame(new_rows)
-
-            # build pagecontent for Qwen
-            new_df["pagecontent"] = new_df.apply(
-                lambda r: (
-                    f"{r['product_name']} at {r['store_name']} for {r['price']} EUR | "
-                    f"category: {r['category']} | pincode: {pincode}"
-                ),
-                axis=1,
-            )
-
-            # EMBEDDINGS Qwen3 
-            texts = new_df["pagecontent"].tolist()
-            print(f"Embedding {len(texts)} Qwen vectors...")
-            embeddings = qwen_embed(texts)
-            new_df["embedding"] = embeddings
-
-            # prepare Qdrant points
-            points = [
-                models.PointStruct(
-                    id=abs(hash(row["unique_key"] + "_qwen")) % (10**12),
-                    vector=row["embedding"],
-                    payload={
-                        "category": row["category"],
-                        "product_name": row["product_name"],
-                        "price": float(row["price"]),
-                        "pincode": pincode,
-                        "store_name": row["store_name"],
-                        "product_url": row.get("product_url"),
-                        "etl_version": 1,
-                    }
-                )
-                for _, row in new_df.iterrows()
-            ]
-
-            chunk_upsert(points)
-            print(f"Upserted {len(points)} Qwen items")
-
-        print("Qwen ingestion DONE")
-
-    except Exception as e:
-        raise Exception(f"Qwen ingestion failed: {e}")
\ No newline at end of file
+    ingest_offers(df, pincode, [QWEN_BACKEND])
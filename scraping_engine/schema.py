@@ -0,0 +1,211 @@
+"""Creates and migrates the offer collections: vector storage, HNSW, quantization and payload indexes.
+
+    python -m scraping_engine.schema --dry-run
+    python -m scraping_engine.schema
+
+Ingestion calls ensure_offer_collection(), which creates a missing collection with these
+settings (sized by the first embedded batch) and adds missing payload indexes. Vector
+settings of existing collections are only brought up to date by this CLI.
+"""
+import os
+import sys
+import argparse
+import threading
+from qdrant_client import QdrantClient, models
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+
+HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "128"))
+# Original vectors on disk, int8 copies in RAM for search (rescored from disk)
+VECTORS_ON_DISK = os.getenv("QDRANT_VECTORS_ON_DISK", "1") == "1"
+QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "int8")  # "int8" or "none"
+# Per-collection vector storage: "int8" stores float16 and always keeps int8 copies in RAM
+STORAGE_DATATYPES = {
+    "float32": models.Datatype.FLOAT32,
+    "float16": models.Datatype.FLOAT16,
+    "int8": models.Datatype.FLOAT16,
+}
+
+# Every search filters on pincode; store and category narrow listings, the dates drive validity
+OFFER_INDEXES = {
+    "pincode": models.PayloadSchemaType.KEYWORD,
+    "store_name": models.PayloadSchemaType.KEYWORD,
+    "category": models.PayloadSchemaType.KEYWORD,
+    "etl_version": models.PayloadSchemaType.INTEGER,
+    "valid_from": models.PayloadSchemaType.DATETIME,
+    "valid_until": models.PayloadSchemaType.DATETIME,
+    "scraped_at": models.PayloadSchemaType.DATETIME,
+}
+REGISTRY_INDEXES = {
+    "pincode": models.PayloadSchemaType.KEYWORD,
+}
+
+_ensured = {}  # collection -> vector size, checked once per process
+_lock = threading.Lock()
+
+
+def _quantization_config(storage: str = "float32"):
+    if QUANTIZATION == "int8" or storage == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    return None
+
+
+def _hnsw_config():
+    return models.HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT)
+
+
+def _create(collection: str, dim: int, storage: str = "float32"):
+    qdrant.create_collection(
+        collection_name=collection,
+        vectors_config=models.VectorParams(
+            size=dim,
+            distance=models.Distance.COSINE,
+            on_disk=VECTORS_ON_DISK,
+            datatype=STORAGE_DATATYPES[storage],
+        ),
+        hnsw_config=_hnsw_config(),
+        quantization_config=_quantization_config(storage),
+    )
+    print(f"[SCHEMA] Created {collection} (dim {dim}, {storage})")
+
+
+# Settings that differ from the target, as update_collection arguments
+def _pending_updates(info, storage: str = "float32"):
+    updates = {}
+
+    hnsw = info.config.hnsw_config
+    if hnsw.m != HNSW_M or hnsw.ef_construct != HNSW_EF_CONSTRUCT:
+        updates["hnsw_config"] = _hnsw_config()
+
+    vectors = info.config.params.vectors
+    if isinstance(vectors, models.VectorParams) and bool(vectors.on_disk) != VECTORS_ON_DISK:
+        updates["vectors_config"] = {"": models.VectorParamsDiff(on_disk=VECTORS_ON_DISK)}
+
+    wanted = _quantization_config(storage)
+    current = info.config.quantization_config
+    if wanted is not None and not isinstance(current, models.ScalarQuantization):
+        updates["quantization_config"] = wanted
+    elif wanted is None and current is not None:
+        updates["quantization_config"] = models.Disabled.DISABLED
+
+    return updates
+
+
+def _missing_indexes(info, indexes: dict):
+    schema = info.payload_schema or {}
+    return {
+        field: field_type for field, field_type in indexes.items()
+        if field not in schema or schema[field].data_type != field_type
+    }
+
+
+# The datatype is fixed at creation; changing it means dropping the collection and re-ingesting
+def _datatype_mismatch(info, storage: str):
+    vectors = info.config.params.vectors
+    if not isinstance(vectors, models.VectorParams):
+        return None
+    current = vectors.datatype or models.Datatype.FLOAT32
+    if current == STORAGE_DATATYPES[storage]:
+        return None
+    return f"stores {current.value} vectors, target is {storage}"
+
+
+def migrate_collection(collection: str, indexes: dict, dry_run: bool = False, vector_settings: bool = True,
+                       storage: str = "float32"):
+    info = qdrant.get_collection(collection)
+    updates = _pending_updates(info, storage) if vector_settings else {}
+    mismatch = _datatype_mismatch(info, storage) if vector_settings else None
+    if mismatch:
+        print(f"[SCHEMA] {collection}: {mismatch}; drop and re-ingest to change it")
+    missing = _missing_indexes(info, indexes)
+
+    for name in updates:
+        print(f"[SCHEMA] {collection}: {'would update' if dry_run else 'updating'} {name}")
+    for field in missing:
+        print(f"[SCHEMA] {collection}: {'would index' if dry_run else 'indexing'} {field}")
+    if dry_run:
+        return
+
+    if updates:
+        qdrant.update_collection(collection_name=collection, **updates)
+    for field, field_type in missing.items():
+        qdrant.create_payload_index(collection_name=collection, field_name=field, field_schema=field_type)
+
+
+# Vector size of an existing collection, None if it does not exist yet
+def collection_dim(collection: str):
+    if collection in _ensured:
+        return _ensured[collection]
+    if not qdrant.collection_exists(collection):
+        return None
+    return getattr(qdrant.get_collection(collection).config.params.vectors, "size", None)
+
+
+# One embedding call, for the CLI paths that create a collection before anything is ingested
+def probe_dim(embed_fn):
+    return len(embed_fn(["dimension probe"])[0])
+
+
+def ensure_offer_collection(collection: str, dim: int, storage: str = "float32"):
+    """Create `collection` for `dim`-sized vectors if missing, and add missing payload indexes.
+
+    Vector settings of existing collections are not migrated here; that is ensure_all()
+    (the CLI below). Raises if an existing collection has a different vector size.
+    """
+    with _lock:
+        if collection not in _ensured:
+            if not qdrant.collection_exists(collection):
+                _create(collection, dim, storage)
+                missing, size = OFFER_INDEXES, dim
+            else:
+                info = qdrant.get_collection(collection)
+                missing, size = _missing_indexes(info, OFFER_INDEXES), getattr(info.config.params.vectors, "size", dim)
+            # Index creation is cheap and idempotent, unlike the vector settings
+            for field, field_type in missing.items():
+                print(f"[SCHEMA] {collection}: indexing {field}")
+                qdrant.create_payload_index(collection_name=collection, field_name=field, field_schema=field_type)
+            _ensured[collection] = size
+    if _ensured[collection] != dim:
+        raise RuntimeError(f"{collection} holds {_ensured[collection]}-dim vectors but the embedder gives {dim}; "
+                           "drop it and re-ingest, or restore the dimension")
+
+
+def ensure_all(dry_run: bool = False):
+    # Imported lazily: loading a backend loads its model
+    from scraping_engine.scraper_engine import GEMINI_BACKEND
+    from scraping_engine.bert_scraper_engine import BERT_BACKEND
+    from scraping_engine.qwen_scraper_engine import QWEN_BACKEND
+
+    existing = {c.name for c in qdrant.get_collections().collections}
+    for backend in [GEMINI_BACKEND, BERT_BACKEND, QWEN_BACKEND]:
+        if backend.collection not in existing:
+            if dry_run:
+                print(f"[SCHEMA] {backend.collection}: would create")
+                continue
+            ensure_offer_collection(backend.collection, probe_dim(backend.embed), backend.storage)
+        else:
+            migrate_collection(backend.collection, OFFER_INDEXES, dry_run, storage=backend.storage)
+
+    if "pincodes" in existing:
+        migrate_collection("pincodes", REGISTRY_INDEXES, dry_run, vector_settings=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or migrate the offer collections")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would change")
+    args = parser.parse_args()
+
+    ensure_all(dry_run=args.dry_run)
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cleaning.helpers import normalize_key
+
+# Rows handed to the ingest functions at once while the scrapers keep scrolling
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+
+
+def ingest_stream(batches, pincode: str, ingest_fns, batch_size: int = INGEST_BATCH_SIZE):
+    """Consume (store, records) batches and ingest them in bounded micro-batches.
+
+    `batches` is typically iter_all_offers(); every micro-batch goes through each
+    function in `ingest_fns` (usually pipeline.ingest_all, which fans out to all
+    backends) while the scrapers work on later categories. Returns the number of rows ingested.
+    """
+    start_time = time.time()
+    buffer = []
+    seen = set()
+    total = 0
+
+    def flush(rows):
+        df = pd.DataFrame(rows)
+        for ingest in ingest_fns:
+            ingest(df, pincode)
+        print(f"[STREAM] Ingested batch of {len(rows)} rows ({time.time() - start_time:.2f}s)")
+
+    for store, records in batches:
+        for record in records:
+            # A product listed twice keeps its first price, as prepare_offers does within one batch
+            key = normalize_key(record.get("product_name"), record.get("store_name"))
+            if key in seen:
+                continue
+            seen.add(key)
+            buffer.append(record)
+
+        while len(buffer) >= batch_size:
+            flush(buffer[:batch_size])
+            total += batch_size
+            del buffer[:batch_size]
+
+    if buffer:
+        flush(buffer)
+        total += len(buffer)
+
+    print(f"[STREAM] Ingested {total} rows in {time.time() - start_time:.2f}s")
+    return total
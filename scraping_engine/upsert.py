@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60.0)
+
+# Request body budget; Qwen vectors are ~7x the size of BERT ones, so a fixed count does not fit all
+UPSERT_MAX_BYTES = int(os.getenv("UPSERT_MAX_BYTES", str(4 * 1024 * 1024)))
+UPSERT_MAX_POINTS = int(os.getenv("UPSERT_MAX_POINTS", "1000"))
+UPSERT_PARALLEL = int(os.getenv("UPSERT_PARALLEL", "4"))
+UPSERT_RETRIES = int(os.getenv("UPSERT_RETRIES", "4"))
+UPSERT_BACKOFF = float(os.getenv("UPSERT_BACKOFF_SECONDS", "0.5"))
+# wait=False returns once Qdrant accepted the batch, before it is indexed
+UPSERT_WAIT = os.getenv("UPSERT_WAIT", "1") == "1"
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class VectorBatch:
+    """Points as columns: ids, a float32 (n, dim) array and payloads.
+
+    Slicing shares the array; Python floats are only created for the batch being sent.
+    """
+
+    def __init__(self, ids, vectors, payloads):
+        self.ids = ids
+        self.vectors = vectors
+        self.payloads = payloads
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index: slice):
+        return VectorBatch(self.ids[index], self.vectors[index], self.payloads[index])
+
+    def request(self):
+        return models.Batch(ids=list(self.ids), vectors=self.vectors.tolist(), payloads=list(self.payloads))
+
+
+# Rough JSON size of a point: ~12 characters per float plus the payload
+def _point_bytes(point):
+    vector = point.vector
+    floats = len(vector) if isinstance(vector, list) else sum(len(v) for v in vector.values())
+    return 12 * floats + _payload_bytes(point.payload)
+
+
+def _payload_bytes(payload):
+    return len(json.dumps(payload, default=str)) + 64
+
+
+# Start and end of each batch, given the estimated size of every point
+def _batch_bounds(sizes, max_bytes: int, max_points: int):
+    bounds = []
+    start = 0
+    size = 0
+    for i, point_size in enumerate(sizes):
+        if i > start and (size + point_size > max_bytes or i - start >= max_points):
+            bounds.append((start, i))
+            start = i
+            size = 0
+        size += point_size
+    if start < len(sizes):
+        bounds.append((start, len(sizes)))
+    return bounds
+
+
+def make_batches(points, max_bytes: int = UPSERT_MAX_BYTES, max_points: int = UPSERT_MAX_POINTS):
+    if isinstance(points, VectorBatch):
+        vector_bytes = 12 * (points.vectors.shape[1] if points.vectors.ndim == 2 else 0)
+        sizes = [vector_bytes + _payload_bytes(payload) for payload in points.payloads]
+    else:
+        points = list(points)
+        sizes = [_point_bytes(point) for point in points]
+    return [points[start:end] for start, end in _batch_bounds(sizes, max_bytes, max_points)]
+
+
+# qdrant-client wraps transport errors (and response validation errors) in ResponseHandlingException
+def _cause(e):
+    return e.source if isinstance(e, ResponseHandlingException) else e
+
+
+def _is_timeout(e):
+    return isinstance(_cause(e), (httpx.TimeoutException, TimeoutError))
+
+
+# Only transport failures and the status codes above; anything else is a bug that retrying will not fix
+def _is_retryable(e):
+    if isinstance(e, UnexpectedResponse):
+        return e.status_code in RETRYABLE_STATUS
+    return isinstance(_cause(e), (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+# Point IDs are deterministic, so resending a batch that may already have landed is harmless
+def _send(collection: str, batch, wait: bool):
+    for attempt in range(UPSERT_RETRIES + 1):
+        try:
+            qdrant.upsert(collection, batch.request() if isinstance(batch, VectorBatch) else batch, wait=wait)
+            return len(batch)
+        except Exception as e:
+            # A batch that times out is too big for the server right now: halve it
+            if _is_timeout(e) and len(batch) > 1:
+                half = len(batch) // 2
+                print(f"[UPSERT] {collection}: timeout, splitting batch of {len(batch)}")
+                return _send(collection, batch[:half], wait) + _send(collection, batch[half:], wait)
+            if attempt == UPSERT_RETRIES or not _is_retryable(e):
+                raise
+            delay = UPSERT_BACKOFF * (2 ** attempt) * (1 + random.random())
+            print(f"[UPSERT] {collection}: {e} - retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def upsert_points(collection: str, points, wait: bool = UPSERT_WAIT, parallel: int = UPSERT_PARALLEL,
+                  max_points: int = UPSERT_MAX_POINTS):
+    """Upsert `points` (PointStructs or a VectorBatch) in byte-bounded batches, at most `parallel` in flight."""
+    batches = make_batches(points, max_points=max_points)
+    if not batches:
+        return 0
+    if len(batches) == 1:
+        return _send(collection, batches[0], wait)
+
+    with ThreadPoolExecutor(max_workers=min(parallel, len(batches)), thread_name_prefix="upsert") as executor:
+        return sum(executor.map(lambda batch: _send(collection, batch, wait), batches))
@@ -1,76 +1,172 @@
-import time
+import os
 import json
-import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from supermarket_scrapers.base import SupermarketScraper, OfferRecord, register_scraper
+from supermarket_scrapers.waits import WaitTimer
+from supermarket_scrapers.snapshots import SNAPSHOT_DIR
 
-def scrape_aldi(pincode: str):
+ALDI_URL = "https://www.aldi-nord.de/filialen-und-oeffnungszeiten.html"
+
+# "script" reads a category in one round trip, "elements" uses per-tile WebDriver calls
+EXTRACT_MODE = os.getenv("SCRAPER_EXTRACT_MODE", "script")
+
+# Identifies the store behind an autocomplete suggestion, so pincodes served by it share offers
+STORE_ID_JS = """
+    const option = arguments[0];
+    const tagged = option.querySelector("[data-store-id], [data-id]") || option;
+    return tagged.getAttribute("data-store-id")
+        || tagged.getAttribute("data-id")
+        || option.id
+        || option.innerText.trim().replace(/\\s+/g, " ");
+"""
+
+# Returns [[category, [[data-article, href], ...]], ...] as a JSON string,
+# for the category passed as argument or for the whole page
+EXTRACT_TILES_JS = """
+    const groups = arguments[0] ? [arguments[0]] : document.querySelectorAll("div.mod-tile-group");
+    const out = [];
+    for (const group of groups) {
+        const title = group.querySelector("div.mod-headline h2");
+        const tiles = [];
+        for (const tile of group.querySelectorAll("div[data-t-name='ArticleTile']")) {
+            const link = tile.querySelector("a.mod-article-tile__action");
+            tiles.push([tile.getAttribute("data-article") || "", link ? link.href : ""]);
+        }
+        out.push([title ? title.innerText.trim() : "Unknown", tiles]);
+    }
+    return JSON.stringify(out);
+"""
+
+
+@register_scraper
+class AldiScraper(SupermarketScraper):
+    name = "ALDI"
+    start_url = ALDI_URL
+    item_selector = "div[data-t-name='ArticleTile']"
+
+    def open_offers(self, driver, pincode: str, timer: WaitTimer):
+        driver.get(ALDI_URL)
+
+        # Enter pincode
+        region = None
+        try:
+            first_option = find_store_option(driver, pincode, timer)
+            region = driver.execute_script(STORE_ID_JS, first_option)
+            driver.execute_script("arguments[0].click();", first_option)
+            print(f"Entered pincode: {pincode} (store {region})")
+        except Exception as e:
+            print("Could not select location:", e)
+
+        # Click 'ANGEBOTE'
+        try:
+            angebote_btn = timer.until(
+                "location",
+                EC.element_to_be_clickable(
+                    (By.XPATH, "//a[contains(@class, 'ubsf_location-list-item-cta') and contains(., 'ANGEBOTE')]")
+                )
+            )
+            if angebote_btn is None:
+                raise TimeoutError("no ANGEBOTE link")
+            driver.execute_script("arguments[0].click();", angebote_btn)
+            print("Clicked Angebote")
+
+            # Wait for the offer tiles instead of sleeping a fixed time
+            timer.until("offers", EC.presence_of_element_located((By.CSS_SELECTOR, "div.mod-tile-group")))
+            timer.settled_count("offers", "div.mod-tile-group div[data-t-name='ArticleTile']")
+        except Exception as e:
+            print("Could not click 'ANGEBOTE':", e)
+
+        return region
+
+    def find_categories(self, driver):
+        return driver.find_elements(By.CSS_SELECTOR, "div.mod-tile-group")
+
+    def extract_category(self, driver, element, pincode: str):
+        if EXTRACT_MODE == "script":
+            return _extract_with_script(driver, pincode, element)
+        return _extract_with_elements([element], pincode)
+
+    # The first store the store finder suggests, same choice open_offers makes
+    def resolve_region(self, pincode: str):
+        with self.pool().lease() as driver:
+            driver.get(ALDI_URL)
+            option = find_store_option(driver, pincode, WaitTimer(driver))
+            return driver.execute_script(STORE_ID_JS, option)
+
+
+def scrape_aldi(pincode: str, snapshot_dir: str = SNAPSHOT_DIR):
     """Scrape ALDI products for a given pincode."""
-    start_time = time.time()
-    
-    driver = webdriver.Chrome()
-    driver.get("https://www.aldi-nord.de/filialen-und-oeffnungszeiten.html")
-
-    # Accept cookies
-    deadline = time.time() + 10
-    clicked = False
-    while time.time() < deadline and not clicked:
-        clicked = driver.execute_script("""
-            const root = document.querySelector('#usercentrics-root');
-            if (root && root.shadowRoot) {
-                const btn = root.shadowRoot.querySelector("button[data-testid='uc-accept-all-button']");
-                if (btn) { btn.click(); return true; }
-            }
-            return false;
-        """)
-        if not clicked:
-            time.sleep(0.25)
-    print("Cookies accepted")
-
-    # Enter pincode
-    try:
-        search_input = WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.ID, "autocomplete-input"))
-        )
-        search_input.clear()
-        search_input.send_keys(pincode)
-        time.sleep(1)
-
-        first_option = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "ul#autocomplete-dropdown li:first-child"))
-        )
-        driver.execute_script("arguments[0].click();", first_option)
-        print(f"Entered pincode: {pincode}")
-        time.sleep(2) 
-    except Exception as e:
-        print("Could not select location:", e)
-
-    # Click 'ANGEBOTE'
+    return AldiScraper().scrape(pincode, snapshot_dir)
+
+
+def iter_aldi_offers(pincode: str, snapshot_dir: str = SNAPSHOT_DIR, stats: dict = None):
+    return AldiScraper().iter_offers(pincode, snapshot_dir, stats)
+
+
+# Type the pincode into the store finder and return the first suggested store
+def find_store_option(driver, pincode: str, timer: WaitTimer):
+    search_input = timer.until(
+        "location",
+        EC.presence_of_element_located((By.ID, "autocomplete-input"))
+    )
+    if search_input is None:
+        raise TimeoutError("no store search input")
+    search_input.clear()
+    search_input.send_keys(pincode)
+
+    first_option = timer.until(
+        "location",
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "ul#autocomplete-dropdown li:first-child"))
+    )
+    if first_option is None:
+        raise TimeoutError("no autocomplete suggestion")
+    return first_option
+
+
+def make_record(category, data_raw, href, pincode):
+    if not data_raw:
+        return None
+
+    href = href or ""
+    if href.startswith("/"):
+        product_url = "https://www.aldi-nord.de" + href
+    else:
+        product_url = href
+
     try:
-        angebote_btn = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//a[contains(@class, 'ubsf_location-list-item-cta') and contains(., 'ANGEBOTE')]")
-            )
-        )
-        driver.execute_script("arguments[0].click();", angebote_btn)
-        print("Clicked Angebote")
-        time.sleep(2)  
-    except Exception as e:
-        print("Could not click 'ANGEBOTE':", e)
-
-    # Scrape offers
+        data_json = json.loads(data_raw.replace("&quot;", '"'))
+    except json.JSONDecodeError:
+        return None
+
+    info = data_json.get("productInfo", {})
+    return OfferRecord(
+        category=category,
+        product_name=info.get("productName"),
+        price=info.get("priceWithTax"),
+        product_url=product_url,
+        pincode=str(pincode),
+        store_name="ALDI"
+    )
+
+
+# One execute_script call per category instead of 2-3 round trips per tile
+def _extract_with_script(driver, pincode: str, root=None):
+    raw = driver.execute_script(EXTRACT_TILES_JS, root)
+
     records = []
-    categories = driver.find_elements(By.CSS_SELECTOR, "div.mod-tile-group")
-    total_categories = len(categories)
-    print(f"Total categories found: {total_categories}")
+    for category, tiles in json.loads(raw or "[]"):
+        for data_raw, href in tiles:
+            # None marks a tile without usable data, counted as skipped by the base class
+            records.append(make_record(category, data_raw, href, pincode))
+
+    return records
 
-    for cat in categories:
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", cat)
-        time.sleep(0.5)
 
+def _extract_with_elements(categories, pincode: str):
+
+    records = []
+    for cat in categories:
         try:
             category = cat.find_element(By.CSS_SELECTOR, "div.mod-headline h2").text.strip()
         except:
@@ -81,42 +177,16 @@ def scrape_aldi(pincode: str):
         for prod in products:
             data_raw = prod.get_attribute("data-article")
             if not data_raw:
+                records.append(None)
                 continue
             
             # Get product URL
             try:
                 link_el = prod.find_element(By.CSS_SELECTOR, "a.mod-article-tile__action")
                 href = link_el.get_attribute("href") or ""
-                if href.startswith("/"):
-                    product_url = "https://www.aldi-nord.de" + href
-                else:
-                    product_url = href
             except Exception:
-                product_url = ""
+                href = ""
 
-            try:
-                data_json = json.loads(data_raw.replace("&quot;", '"'))
-                info = data_json.get("productInfo", {})
-                records.append({
-                    "category": category,
-                    "product_name": info.get("productName"),
-                    "price": info.get("priceWithTax"),
-                    "product_url": product_url,       
-                    "pincode": str(pincode),
-                    "store_name": "ALDI"
-                })
-            except json.JSONDecodeError:
-                continue
+            records.append(make_record(category, data_raw, href, pincode))
 
-    driver.quit()
-    
-    # Display scraping summary
-    end_time = time.time()
-    total_time = end_time - start_time
-    total_products = len(records)
-    
-    print(f"Total products: {total_products}")
-    print(f"Total time: {total_time:.2f} seconds")
-    print(f"Average time: {total_time/max(total_products, 1):.3f} seconds")
-    
-    return pd.DataFrame(records)
\ No newline at end of file
+    return records
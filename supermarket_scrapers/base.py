@@ -0,0 +1,180 @@
+import os
+import time
+import importlib
+import pandas as pd
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from typing import Optional, Union
+
+from supermarket_scrapers.driver_pool import get_pool, ACCEPT_COOKIES_JS
+from supermarket_scrapers.waits import WaitTimer
+from supermarket_scrapers.snapshots import save_snapshot, SNAPSHOT_DIR
+
+# Share of failed categories at which a scrape counts as failed instead of partial
+MAX_FAILED_CATEGORIES = float(os.getenv("SCRAPER_MAX_FAILED_CATEGORIES", "0.5"))
+
+
+@dataclass
+class OfferRecord:
+    """One scraped offer. `price` is kept as scraped (text or number); cleaning parses it later."""
+    category: str
+    product_name: str
+    price: Union[str, float, None]
+    product_url: str
+    pincode: str
+    store_name: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class SupermarketScraper(ABC):
+    """Base class for a supermarket chain.
+
+    Subclasses set `name` and `start_url` and implement `open_offers`,
+    `find_categories` and `extract_category`. The base class leases a warm
+    driver (cookie banner handled by the pool using `accept_cookies_js`),
+    scrolls category by category, records wait and per-category timings,
+    counts failed categories and skipped tiles instead of aborting, and
+    saves snapshots. A scrape that finds no categories, or where at least
+    MAX_FAILED_CATEGORIES of them fail, raises once it is done.
+    """
+
+    name = ""
+    start_url = ""
+    accept_cookies_js = ACCEPT_COOKIES_JS
+    # Items inside one category, used to wait until a scrolled category has rendered
+    item_selector = ""
+
+    # --- hooks for subclasses ---
+
+    # Navigate to the offers for `pincode`; returns the store region if the page reveals it
+    @abstractmethod
+    def open_offers(self, driver, pincode: str, timer: WaitTimer) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def find_categories(self, driver) -> list:
+        ...
+
+    # OfferRecords of one category; None entries count as skipped tiles
+    @abstractmethod
+    def extract_category(self, driver, element, pincode: str) -> list:
+        ...
+
+    # Store region for a pincode without scraping it (see store_resolver)
+    def resolve_region(self, pincode: str) -> Optional[str]:
+        return None
+
+    # --- shared machinery ---
+
+    def pool(self):
+        return get_pool(self.name, self.start_url, self.accept_cookies_js)
+
+    def iter_offers(self, pincode: str, snapshot_dir: str = SNAPSHOT_DIR, stats: dict = None):
+        """Yield the records (dicts) of one category at a time.
+
+        `stats` receives wait timings, per-category timings, region and error
+        counts once the generator is exhausted.
+        """
+        category_timings = []
+        errors = {"categories_failed": 0, "items_skipped": 0, "messages": []}
+
+        # Leased drivers are already running and past the cookie banner
+        with self.pool().lease() as driver:
+            timer = WaitTimer(driver)
+            region = self.open_offers(driver, pincode, timer)
+
+            categories = self.find_categories(driver)
+            print(f"[{self.name}] Total categories found: {len(categories)}")
+            if not categories:
+                raise RuntimeError(f"{self.name}: no categories found for {pincode}")
+
+            # Scroll each category into view so its lazily rendered items are in the DOM
+            for element in categories:
+                category_start = time.time()
+                try:
+                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", element)
+                    timer.settled_count("category", self.item_selector, root=element)
+                    extracted = self.extract_category(driver, element, pincode)
+                except Exception as e:
+                    errors["categories_failed"] += 1
+                    errors["messages"].append(str(e)[:200])
+                    print(f"[{self.name}] Category failed: {e}")
+                    continue
+
+                records = [r.to_dict() for r in extracted if r is not None]
+                errors["items_skipped"] += len(extracted) - len(records)
+                category_timings.append({
+                    "category": records[0]["category"] if records else "Unknown",
+                    "items": len(records),
+                    "seconds": round(time.time() - category_start, 3),
+                })
+                yield records
+
+            if snapshot_dir:
+                save_snapshot(driver, self.name, pincode, snapshot_dir)
+
+        timer.print_summary()
+        if errors["categories_failed"] or errors["items_skipped"]:
+            print(f"[{self.name}] {errors['categories_failed']} categories failed, {errors['items_skipped']} items skipped")
+        if stats is not None:
+            stats["wait_timings"] = timer.summary()
+            stats["category_timings"] = category_timings
+            stats["errors"] = errors
+            stats["region"] = region
+
+        # Reported as a store error, so the pincode is registered as partial and retried
+        if errors["categories_failed"] and errors["categories_failed"] >= MAX_FAILED_CATEGORIES * len(categories):
+            raise RuntimeError(f"{self.name}: {errors['categories_failed']}/{len(categories)} categories failed: "
+                               f"{'; '.join(errors['messages'][:3])}")
+
+    def scrape(self, pincode: str, snapshot_dir: str = SNAPSHOT_DIR):
+        start_time = time.time()
+
+        stats = {}
+        records = [
+            record
+            for batch in self.iter_offers(pincode, snapshot_dir, stats)
+            for record in batch
+        ]
+
+        # Display scraping summary
+        total_time = time.time() - start_time
+        total_products = len(records)
+
+        print(f"[{self.name}] Total products: {total_products}")
+        print(f"[{self.name}] Total time: {total_time:.2f} seconds")
+        print(f"[{self.name}] Average time: {total_time/max(total_products, 1):.3f} seconds")
+        for timing in sorted(stats.get("category_timings", []), key=lambda t: t["seconds"], reverse=True)[:5]:
+            print(f"[{self.name}]   {timing['category']}: {timing['items']} items in {timing['seconds']:.2f}s")
+
+        df = pd.DataFrame(records)
+        df.attrs.update(stats)
+        return df
+
+
+# --------------------------------------------------
+# Registry
+# --------------------------------------------------
+
+# Modules that register a scraper when imported; add more via SCRAPER_PLUGINS=module.a,module.b
+PLUGINS = [
+    "supermarket_scrapers.rewe_scraper",
+    "supermarket_scrapers.aldi_scraper",
+]
+
+_registry = {}
+
+
+def register_scraper(cls):
+    """Class decorator that makes a SupermarketScraper available to the orchestrator."""
+    _registry[cls.name] = cls()
+    return cls
+
+
+def get_scrapers():
+    extra = [m.strip() for m in os.getenv("SCRAPER_PLUGINS", "").split(",") if m.strip()]
+    for module in PLUGINS + extra:
+        importlib.import_module(module)
+    return dict(_registry)
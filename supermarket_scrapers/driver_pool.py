@@ -0,0 +1,205 @@
+import os
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from supermarket_scrapers.waits import WaitTimer
+
+# Pool settings, overridable from .env
+POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "1"))
+MAX_USES = int(os.getenv("SCRAPER_DRIVER_MAX_USES", "20"))
+LEASE_TIMEOUT = float(os.getenv("SCRAPER_LEASE_TIMEOUT", "180"))
+HEADLESS = os.getenv("SCRAPER_HEADLESS", "1") != "0"
+
+ACCEPT_COOKIES_JS = """
+    const root = document.querySelector('#usercentrics-root');
+    if (root && root.shadowRoot) {
+        const btn = root.shadowRoot.querySelector("button[data-testid='uc-accept-all-button']");
+        if (btn) { btn.click(); return true; }
+    }
+    return false;
+"""
+
+
+def new_chrome():
+    options = webdriver.ChromeOptions()
+    if HEADLESS:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    return webdriver.Chrome(options=options)
+
+
+# Click the Usercentrics "accept all" button as soon as it renders. Returns True once clicked.
+def accept_cookies(driver, timer: WaitTimer = None, accept_js: str = ACCEPT_COOKIES_JS):
+    timer = timer or WaitTimer(driver)
+    return bool(timer.until("cookies", lambda d: d.execute_script(accept_js)))
+
+
+class DriverPool:
+    """Keeps warm Chrome sessions for one store, with the cookie banner already accepted.
+
+    Drivers are leased with `with pool.lease() as driver:`. A driver is health
+    checked before it is handed out and quit after `max_uses` leases or after a
+    lease that raised, so a broken session never goes back into the pool.
+    A lease that overran its deadline can be ended from another thread with abort().
+    """
+
+    def __init__(self, name: str, warm_url: str, size: int = POOL_SIZE, max_uses: int = MAX_USES,
+                 accept_js: str = ACCEPT_COOKIES_JS):
+        self.name = name
+        self.warm_url = warm_url
+        self.accept_js = accept_js
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._leased = {}  # thread ident -> driver leased by that thread
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        start_time = time.time()
+        driver = new_chrome()
+        timer = WaitTimer(driver)
+        try:
+            driver.get(self.warm_url)
+            if accept_cookies(driver, timer, self.accept_js):
+                print(f"[POOL] {self.name}: cookies accepted after {timer.totals['cookies']:.2f}s")
+        except Exception:
+            driver.quit()
+            raise
+        print(f"[POOL] {self.name}: launched Chrome in {time.time() - start_time:.2f}s")
+        return driver
+
+    def _healthy(self, driver):
+        try:
+            driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._healthy(driver):
+                return driver
+            print(f"[POOL] {self.name}: dropping dead session")
+            self._discard(driver)
+
+        with self._lock:
+            can_launch = self._created < self.size
+            if can_launch:
+                self._created += 1
+
+        if can_launch:
+            try:
+                driver = self._launch()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            with self._lock:
+                self._uses[id(driver)] = 0
+            return driver
+
+        # Pool is at capacity: wait for another scrape to give a driver back
+        try:
+            driver = self._idle.get(timeout=LEASE_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError(f"No {self.name} driver available after {LEASE_TIMEOUT:.0f}s")
+        if self._healthy(driver):
+            return driver
+        self._discard(driver)
+        return self.acquire()
+
+    def release(self, driver, broken: bool = False):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_uses
+
+        if broken or worn_out or not self._healthy(driver):
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        owner = threading.get_ident()
+        with self._lock:
+            self._leased[owner] = driver
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            with self._lock:
+                aborted = self._leased.pop(owner, None) is not driver
+            # An aborted driver was already quit and its slot freed
+            if not aborted:
+                self.release(driver, broken=broken)
+
+    # Quit the driver leased by thread `owner` and free its slot now; that scrape fails on its next driver call
+    def abort(self, owner: int):
+        with self._lock:
+            driver = self._leased.pop(owner, None)
+        if driver is not None:
+            print(f"[POOL] {self.name}: quitting the driver of a timed-out scrape")
+            self._discard(driver)
+
+    # Pre-launch drivers so the first scrape does not pay for Chrome startup
+    def warm(self, count: int = None):
+        count = self.size if count is None else min(count, self.size)
+        drivers = []
+        with self._lock:
+            missing = max(0, count - self._created)
+        for _ in range(missing):
+            drivers.append(self.acquire())
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# One pool per store, shared by every scrape in this process
+def get_pool(name: str, warm_url: str, accept_js: str = ACCEPT_COOKIES_JS):
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = DriverPool(name, warm_url, accept_js=accept_js)
+        return _pools[name]
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,174 @@
+import os
+import time
+import queue
+import threading
+import pandas as pd
+
+from supermarket_scrapers.base import get_scrapers
+from supermarket_scrapers.scrape_cache import get_cached, put_cached
+from supermarket_scrapers.store_resolver import (
+    resolve_region, remember_region, record_scrape, find_scraped_pincode, has_scrapes
+)
+
+# Seconds a single store may take before we give up on it and keep the rest.
+STORE_TIMEOUT = float(os.getenv("SCRAPE_STORE_TIMEOUT", "120"))
+
+# Category batches buffered between the scrapers and ingestion; bounds memory when ingestion is slower
+STREAM_QUEUE_SIZE = int(os.getenv("SCRAPE_STREAM_QUEUE_SIZE", "8"))
+STREAM_CHUNK = 100
+
+_DONE = object()
+
+
+# Offers of another pincode served by the same store region, if scraped this week
+def _reuse_region(store: str, pincode: str):
+    if not has_scrapes(store):
+        return None
+
+    region = resolve_region(store, pincode)
+    source_pincode = find_scraped_pincode(store, region) if region else None
+    cached = get_cached(store, source_pincode) if source_pincode else None
+    if cached is not None:
+        print(f"[SCRAPE] {store} {pincode} shares region {region} with {source_pincode}, reusing its offers")
+        cached["pincode"] = str(pincode)
+    return cached
+
+
+def _remember_scrape(store: str, pincode: str, df: pd.DataFrame):
+    region = df.attrs.get("region")
+    if region and not df.empty:
+        remember_region(store, pincode, region)
+        record_scrape(store, region, pincode)
+
+
+# Producer thread for iter_all_offers: pushes (store, batch) and finally (store, _DONE) or (store, error).
+# `cancelled` stops it; `dropped` is also set when the store itself timed out
+def _stream_store(store: str, stream_fn, pincode: str, use_cache: bool, out: queue.Queue,
+                  cancelled: threading.Event, dropped: threading.Event):
+
+    def emit(item):
+        while not cancelled.is_set():
+            try:
+                out.put((store, item), timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        cached = None
+        if use_cache:
+            cached = get_cached(store, pincode)
+            if cached is None:
+                cached = _reuse_region(store, pincode)
+
+        if cached is not None:
+            for i in range(0, len(cached), STREAM_CHUNK):
+                if not emit(cached.iloc[i:i + STREAM_CHUNK].to_dict("records")):
+                    return
+            emit(_DONE)
+            return
+
+        stats = {}
+        records = []
+        complete = False
+        offers = stream_fn(pincode, stats=stats)
+        try:
+            for batch in offers:
+                records.extend(batch)
+                if not emit(batch):
+                    return
+            complete = True
+        finally:
+            # Releases the leased driver even when the consumer gave up on this store
+            offers.close()
+            # Ingestion failed mid-stream: keep what was scraped so the retry reads it from the cache
+            if not complete and records and cancelled.is_set() and not dropped.is_set():
+                try:
+                    put_cached(store, pincode, pd.DataFrame(records))
+                    print(f"[SCRAPE] {store}: cached {len(records)} items scraped before ingestion stopped")
+                except Exception as e:
+                    print(f"[SCRAPE] Could not cache {store} result: {e}")
+
+        df = pd.DataFrame(records)
+        df.attrs.update(stats)
+        _remember_scrape(store, pincode, df)
+        if not df.empty:
+            put_cached(store, pincode, df)
+        emit(_DONE)
+
+    except Exception as e:
+        emit(e)
+
+
+def iter_all_offers(pincode: str, timeouts: dict = None, use_cache: bool = True, errors: dict = None):
+    """Stream (store, records) batches from all stores concurrently as categories are scraped.
+
+    Stores already scraped for this pincode in the current promotion week, or whose
+    region (ALDI store, REWE market) was scraped for another pincode, come from the
+    cache. A store is dropped when it sends nothing for its timeout while we are
+    waiting on it; time spent by the consumer on ingestion does not count against
+    the scrapers. Failed or dropped stores are written to `errors`.
+    """
+    timeouts = timeouts or {}
+    errors = {} if errors is None else errors
+    start_time = time.time()
+
+    scrapers = get_scrapers()
+    out = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    cancelled = {store: threading.Event() for store in scrapers}
+    dropped = {store: threading.Event() for store in scrapers}
+    threads = {}
+    for store, scraper in scrapers.items():
+        threads[store] = threading.Thread(
+            target=_stream_store,
+            args=(store, scraper.iter_offers, pincode, use_cache, out, cancelled[store], dropped[store]),
+            name=f"stream-{store}",
+            daemon=True
+        )
+        threads[store].start()
+
+    active = set(scrapers)
+    idle = {store: 0.0 for store in scrapers}
+    counts = {store: 0 for store in scrapers}
+
+    try:
+        while active:
+            limit = min(timeouts.get(store, STORE_TIMEOUT) - idle[store] for store in active)
+            waited_from = time.time()
+            try:
+                store, item = out.get(timeout=max(0.0, limit))
+            except queue.Empty:
+                store, item = None, None
+
+            waited = time.time() - waited_from
+            for other in active:
+                idle[other] += waited
+
+            if store in active:
+                idle[store] = 0.0
+                if item is _DONE:
+                    active.discard(store)
+                    print(f"[SCRAPE] {store} finished: {counts[store]} items after {time.time() - start_time:.2f}s")
+                elif isinstance(item, Exception):
+                    active.discard(store)
+                    errors[store] = str(item)
+                    print(f"[SCRAPE] {store} failed: {item}")
+                else:
+                    counts[store] += len(item)
+                    yield store, item
+
+            for other in list(active):
+                if idle[other] >= timeouts.get(other, STORE_TIMEOUT):
+                    active.discard(other)
+                    dropped[other].set()
+                    cancelled[other].set()
+                    # A producer stuck in a driver call only sees the event after it returns
+                    scrapers[other].pool().abort(threads[other].ident)
+                    errors[other] = f"no offers for {timeouts.get(other, STORE_TIMEOUT):.0f}s"
+                    print(f"[SCRAPE] {other} {errors[other]}, continuing without it")
+    finally:
+        for event in cancelled.values():
+            event.set()
+
+    print(f"[SCRAPE] Stream done: {sum(counts.values())} items in {time.time() - start_time:.2f}s")
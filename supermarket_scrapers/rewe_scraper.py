@@ -1,52 +1,105 @@
-import time
-import pandas as pd
-from selenium import webdriver
+import os
+import json
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from supermarket_scrapers.base import SupermarketScraper, OfferRecord, register_scraper
+from supermarket_scrapers.waits import WaitTimer
+from supermarket_scrapers.snapshots import SNAPSHOT_DIR
 
+REWE_URL = "https://www.rewe.de/angebote/"
 
-def scrape_rewe(pincode: str):
-    
-    start_time = time.time()
-    
-    driver = webdriver.Chrome()
-    driver.get("https://www.rewe.de/angebote/")
-    wait = WebDriverWait(driver, 15)
-
-    # Accept cookies
-    try:
-        deadline = time.time() + 10
-        while time.time() < deadline:
-            clicked = driver.execute_script("""
-                const root = document.querySelector('#usercentrics-root');
-                if (root && root.shadowRoot) {
-                    const btn = root.shadowRoot.querySelector("button[data-testid='uc-accept-all-button']");
-                    if (btn) { btn.click(); return true; }
-                }
-                return false;
-            """)
-            if clicked:
-                print("Cookies accepted")
-                break
-            time.sleep(0.25)
-    except Exception:
-        pass
-
-    time.sleep(2)
-
-    try:
-        wait.until(EC.presence_of_all_elements_located(
-            (By.CSS_SELECTOR, "div.sos-category__content"))
+# rewe.de/angebote is opened without choosing a market, so every pincode sees the same offers
+REWE_REGION = "default"
+
+# "script" reads a category in one round trip, "elements" uses per-offer WebDriver calls
+EXTRACT_MODE = os.getenv("SCRAPER_EXTRACT_MODE", "script")
+
+# Returns [[category, [[name, price, nan], ...]], ...] as a JSON string,
+# for the category passed as argument or for the whole page
+EXTRACT_OFFERS_JS = """
+    const sections = arguments[0] ? [arguments[0]] : document.querySelectorAll("div.sos-category__content");
+    const text = (el) => el ? el.innerText.trim() : "";
+    const out = [];
+    for (const sec of sections) {
+        const title = sec.querySelector(".sos-category__content-title h2");
+        const offers = [];
+        for (const offer of sec.querySelectorAll("div.sos-offer")) {
+            offers.push([
+                text(offer.querySelector("a[data-testid='offer-title-link']")),
+                text(offer.querySelector(".cor-offer-price__tag-price")),
+                offer.getAttribute("data-offer-nan") || ""
+            ]);
+        }
+        out.push([title ? text(title) : "Unknown", offers]);
+    }
+    return JSON.stringify(out);
+"""
+
+
+@register_scraper
+class ReweScraper(SupermarketScraper):
+    name = "REWE"
+    start_url = REWE_URL
+    item_selector = "div.sos-offer"
+
+    def open_offers(self, driver, pincode: str, timer: WaitTimer):
+        driver.get(REWE_URL)
+
+        # Wait until the offer grid has rendered instead of sleeping a fixed time
+        timer.until(
+            "offers",
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.sos-category__content"))
         )
-    except:
-        pass
+        timer.settled_count("offers", "div.sos-category__content div.sos-offer")
+        return REWE_REGION
+
+    def find_categories(self, driver):
+        return driver.find_elements(By.CSS_SELECTOR, "div.sos-category__content")
+
+    def extract_category(self, driver, element, pincode: str):
+        if EXTRACT_MODE == "script":
+            return _extract_with_script(driver, pincode, element)
+        return _extract_with_elements([element], pincode)
+
+    def resolve_region(self, pincode: str):
+        return REWE_REGION
+
+
+def scrape_rewe(pincode: str, snapshot_dir: str = SNAPSHOT_DIR):
+    return ReweScraper().scrape(pincode, snapshot_dir)
+
+
+def iter_rewe_offers(pincode: str, snapshot_dir: str = SNAPSHOT_DIR, stats: dict = None):
+    return ReweScraper().iter_offers(pincode, snapshot_dir, stats)
+
+
+def make_record(category, name, price, nan, pincode):
+    return OfferRecord(
+        category=category,
+        product_name=name,
+        price=price,
+        product_url=f"https://shop.rewe.de/p/{nan}/" if nan else "",
+        pincode=str(pincode),
+        store_name="REWE"
+    )
+
+
+# One execute_script call per category instead of 3 round trips per offer
+def _extract_with_script(driver, pincode: str, root=None):
+    raw = driver.execute_script(EXTRACT_OFFERS_JS, root)
 
     records = []
-    sections = driver.find_elements(By.CSS_SELECTOR, "div.sos-category__content")
-    total_categories = len(sections)
-    print(f"Total categories found: {total_categories}")
+    for category, offers in json.loads(raw or "[]"):
+        for name, price, nan in offers:
+            if name:
+                records.append(make_record(category, name, price, nan, pincode))
 
+    return records
+
+
+def _extract_with_elements(sections, pincode: str):
+
+    records = []
     for sec in sections:
         try:
             category = sec.find_element(
@@ -56,9 +109,6 @@ def scrape_rewe(pincode: str):
         except:
             category = "Unknown"
 
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", sec)
-        time.sleep(0.3)
-
         offers = sec.find_elements(By.CSS_SELECTOR, "div.sos-offer")
         
         for offer in offers:
@@ -83,29 +133,10 @@ def scrape_rewe(pincode: str):
             # product URL 
             try:
                 nan = offer.get_attribute("data-offer-nan")
-                product_url = f"https://shop.rewe.de/p/{nan}/" if nan else ""
             except Exception:
-                product_url = ""
+                nan = ""
 
             if name:
-                records.append({
-                    "category": category,
-                    "product_name": name,
-                    "price": price,
-                    "product_url": product_url,  
-                    "pincode": str(pincode),
-                    "store_name": "REWE"
-                })
-
-    driver.quit()
-
-    # Display scraping summary
-    end_time = time.time()
-    total_time = end_time - start_time
-    total_products = len(records)
-    
-    print(f"Total products: {total_products}")
-    print(f"Total time: {total_time:.2f} seconds")
-    print(f"Average time: {total_time/max(total_products, 1):.3f} seconds")
-
-    return pd.DataFrame(records)
\ No newline at end of file
+                records.append(make_record(category, name, price, nan, pincode))
+
+    return records
@@ -0,0 +1,86 @@
+import os
+import shutil
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Raw scraper output is kept per promotion week, so offers expire at the weekly rollover
+CACHE_DIR = os.getenv(
+    "SCRAPE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "scrapes")
+)
+
+
+# Supermarket offers roll over on Monday, which is also where ISO weeks start.
+def promotion_week(now: datetime = None):
+    year, week, _ = (now or datetime.now()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+# Monday 00:00 of `week`
+def week_start(week: str):
+    return datetime.strptime(f"{week}-1", "%G-W%V-%u")
+
+
+# Monday 00:00 of the week after `week`, i.e. when its cache entries expire
+def week_expiry(week: str):
+    return week_start(week) + timedelta(days=7)
+
+
+def _path(store: str, pincode: str, week: str):
+    return os.path.join(CACHE_DIR, week, f"{store.lower()}_{pincode}.parquet")
+
+
+def get_cached(store: str, pincode: str, week: str = None):
+    week = week or promotion_week()
+    path = _path(store, pincode, week)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+    except Exception as e:
+        print(f"[CACHE] Ignoring unreadable entry {path}: {e}")
+        return None
+
+    print(f"[CACHE] Hit {store} {pincode} {week}: {len(df)} items")
+    return df
+
+
+def put_cached(store: str, pincode: str, df: pd.DataFrame, week: str = None):
+    week = week or promotion_week()
+    path = _path(store, pincode, week)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # REWE prices are strings and ALDI prices are numbers; clean_price handles both as text
+    df = df.copy()
+    if "price" in df.columns:
+        df["price"] = df["price"].astype("string")
+
+    # Write to a temp file first so a crash never leaves a half-written entry behind
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    evict_expired()
+    return path
+
+
+# Drop every week folder whose offers have already rolled over
+def evict_expired(now: datetime = None):
+    now = now or datetime.now()
+    if not os.path.isdir(CACHE_DIR):
+        return []
+
+    evicted = []
+    for week in os.listdir(CACHE_DIR):
+        try:
+            expired = week_expiry(week) <= now
+        except ValueError:
+            continue
+        if expired:
+            shutil.rmtree(os.path.join(CACHE_DIR, week), ignore_errors=True)
+            evicted.append(week)
+
+    if evicted:
+        print(f"[CACHE] Evicted expired weeks: {', '.join(sorted(evicted))}")
+    return evicted
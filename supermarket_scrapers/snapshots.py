@@ -0,0 +1,244 @@
+import os
+import re
+import sys
+import time
+import json
+import pandas as pd
+from datetime import datetime
+from html.parser import HTMLParser
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set to a folder to keep the rendered page of every scrape
+SNAPSHOT_DIR = os.getenv("SCRAPER_SNAPSHOT_DIR")
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+# Elements that innerText separates from their neighbours; inline elements are joined as they are
+_BLOCK_TAGS = {
+    "article", "br", "dd", "div", "dl", "dt", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "td", "th", "tr", "ul",
+}
+
+
+# --------------------------------------------------
+# Capture
+# --------------------------------------------------
+
+# Save the fully rendered DOM as <store>_<pincode>_<timestamp>.html
+def save_snapshot(driver, store: str, pincode: str, snapshot_dir: str):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(snapshot_dir, f"{store.lower()}_{pincode}_{stamp}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
+    print(f"Saved snapshot: {path}")
+    return path
+
+
+# --------------------------------------------------
+# Minimal DOM + CSS selectors (only what the scrapers use)
+# --------------------------------------------------
+
+class Node:
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+
+    @property
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    def get(self, name, default=None):
+        value = self.attrs.get(name)
+        return default if value is None else value
+
+    def iter(self):
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.iter()
+
+    def _raw_text(self):
+        parts = []
+        for child in self.children:
+            if not isinstance(child, Node):
+                parts.append(child)
+            elif child.tag in _BLOCK_TAGS:
+                parts.append(f" {child._raw_text()} ")
+            elif child.tag not in ("script", "style"):
+                parts.append(child._raw_text())
+        return "".join(parts)
+
+    # Whitespace-collapsed text, close to what innerText / WebElement.text return
+    def text(self):
+        return " ".join(self._raw_text().split())
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in _VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        # Tolerate unclosed tags: pop back to the nearest matching open element
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html: str):
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+_COMPOUND_RE = re.compile(r"^([a-zA-Z0-9]*)((?:\.[\w-]+)*)((?:\[[\w-]+=['\"][^'\"]*['\"]\])*)$")
+_ATTR_RE = re.compile(r"\[([\w-]+)=['\"]([^'\"]*)['\"]\]")
+
+
+def _compile(selector: str):
+    steps = []
+    for part in selector.split():
+        m = _COMPOUND_RE.match(part)
+        if not m:
+            raise ValueError(f"Unsupported selector: {selector}")
+        tag, classes, attrs = m.groups()
+        steps.append((
+            tag.lower() or None,
+            [c for c in classes.split(".") if c],
+            _ATTR_RE.findall(attrs),
+        ))
+    return steps
+
+
+def _matches(node, step):
+    tag, classes, attrs = step
+    if tag and node.tag != tag:
+        return False
+    node_classes = node.classes
+    if any(c not in node_classes for c in classes):
+        return False
+    return all(node.attrs.get(k) == v for k, v in attrs)
+
+
+def _matches_path(node, steps, scope):
+    if not _matches(node, steps[-1]):
+        return False
+    ancestor = node.parent
+    for step in reversed(steps[:-1]):
+        while ancestor is not None and ancestor is not scope and not _matches(ancestor, step):
+            ancestor = ancestor.parent
+        if ancestor is None or ancestor is scope:
+            return False
+        ancestor = ancestor.parent
+    return True
+
+
+# querySelectorAll for descendant selectors made of tag, .class and [attr='value']
+def select(scope, selector: str):
+    steps = _compile(selector)
+    return [node for node in scope.iter() if _matches_path(node, steps, scope)]
+
+
+def select_one(scope, selector: str):
+    found = select(scope, selector)
+    return found[0] if found else None
+
+
+# --------------------------------------------------
+# Replay parsers (same records as the live scrapers)
+# --------------------------------------------------
+
+# Record builders are imported lazily because the scrapers import save_snapshot from here
+def parse_rewe_html(html: str, pincode: str):
+    from supermarket_scrapers.rewe_scraper import make_record as rewe_record
+
+    root = parse_html(html)
+
+    records = []
+    for sec in select(root, "div.sos-category__content"):
+        title = select_one(sec, ".sos-category__content-title h2")
+        category = title.text() if title else "Unknown"
+
+        for offer in select(sec, "div.sos-offer"):
+            name_el = select_one(offer, "a[data-testid='offer-title-link']")
+            price_el = select_one(offer, ".cor-offer-price__tag-price")
+            name = name_el.text() if name_el else ""
+            price = price_el.text() if price_el else ""
+            if name:
+                records.append(rewe_record(category, name, price, offer.get("data-offer-nan", ""), pincode).to_dict())
+
+    return pd.DataFrame(records)
+
+
+def parse_aldi_html(html: str, pincode: str):
+    from supermarket_scrapers.aldi_scraper import make_record as aldi_record
+
+    root = parse_html(html)
+
+    records = []
+    for group in select(root, "div.mod-tile-group"):
+        title = select_one(group, "div.mod-headline h2")
+        category = title.text() if title else "Unknown"
+
+        for tile in select(group, "div[data-t-name='ArticleTile']"):
+            link = select_one(tile, "a.mod-article-tile__action")
+            record = aldi_record(category, tile.get("data-article", ""), link.get("href", "") if link else "", pincode)
+            if record:
+                records.append(record.to_dict())
+
+    return pd.DataFrame(records)
+
+
+PARSERS = {
+    "rewe": parse_rewe_html,
+    "aldi": parse_aldi_html,
+}
+
+
+# Re-parse a saved snapshot. Store and pincode default to the ones in the file name.
+def parse_snapshot(path: str, store: str = None, pincode: str = None):
+    name_parts = os.path.basename(path).split("_")
+    store = (store or name_parts[0]).lower()
+    pincode = pincode or (name_parts[1] if len(name_parts) > 2 else "")
+
+    if store not in PARSERS:
+        raise ValueError(f"No snapshot parser for store '{store}'")
+
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    return PARSERS[store](html, pincode)
+
+
+if __name__ == "__main__":
+    # python supermarket_scrapers/snapshots.py snapshots/*.html
+    for snapshot_path in sys.argv[1:]:
+        start_time = time.time()
+        df = parse_snapshot(snapshot_path)
+        print(json.dumps({
+            "snapshot": snapshot_path,
+            "products": len(df),
+            "categories": int(df["category"].nunique()) if not df.empty else 0,
+            "parse_ms": round((time.time() - start_time) * 1000, 1),
+        }))
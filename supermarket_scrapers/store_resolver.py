@@ -0,0 +1,89 @@
+import os
+import json
+import threading
+
+from supermarket_scrapers.base import get_scrapers
+from supermarket_scrapers.scrape_cache import promotion_week
+
+# pincode -> store region, plus which pincode was scraped for each region and week
+REGIONS_PATH = os.getenv(
+    "STORE_REGIONS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "store_regions.json")
+)
+
+_lock = threading.Lock()
+
+
+def _load():
+    try:
+        with open(REGIONS_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {}
+    data.setdefault("pincodes", {})
+    data.setdefault("scraped", {})
+    return data
+
+
+def _save(data):
+    os.makedirs(os.path.dirname(REGIONS_PATH), exist_ok=True)
+    tmp_path = REGIONS_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, REGIONS_PATH)
+
+
+def remember_region(store: str, pincode: str, region: str):
+    with _lock:
+        data = _load()
+        data["pincodes"].setdefault(str(pincode), {})[store] = region
+        _save(data)
+
+
+# Map a pincode to its store region, looking it up (and caching it) on first use
+def resolve_region(store: str, pincode: str):
+    with _lock:
+        region = _load()["pincodes"].get(str(pincode), {}).get(store)
+    if region:
+        return region
+
+    scraper = get_scrapers().get(store)
+    if scraper is None:
+        return None
+    try:
+        region = scraper.resolve_region(pincode)
+    except Exception as e:
+        print(f"[REGION] Could not resolve {store} region for {pincode}: {e}")
+        return None
+
+    if region:
+        remember_region(store, pincode, region)
+        print(f"[REGION] {store} {pincode} -> {region}")
+    return region
+
+
+def record_scrape(store: str, region: str, pincode: str, week: str = None):
+    week = week or promotion_week()
+    with _lock:
+        data = _load()
+        by_week = data["scraped"].setdefault(store, {}).setdefault(region, {})
+        by_week[week] = str(pincode)
+        # Older weeks are useless once their offers rolled over
+        for old_week in [w for w in by_week if w < week]:
+            del by_week[old_week]
+        _save(data)
+
+
+# Pincode whose scrape already covers this region in the given week, if any
+def find_scraped_pincode(store: str, region: str, week: str = None):
+    week = week or promotion_week()
+    with _lock:
+        return _load()["scraped"].get(store, {}).get(region, {}).get(week)
+
+
+# Whether any region of this store was scraped this week, i.e. whether resolving can pay off
+def has_scrapes(store: str, week: str = None):
+    week = week or promotion_week()
+    with _lock:
+        regions = _load()["scraped"].get(store, {})
+    return any(week in by_week for by_week in regions.values())
@@ -0,0 +1,96 @@
+import os
+import time
+from collections import defaultdict
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def _ceiling(name: str, default: float):
+    return float(os.getenv(f"SCRAPER_WAIT_{name.upper()}", default))
+
+
+# Upper bounds (seconds) for every wait. Each wait returns as soon as its condition holds.
+WAIT_CEILINGS = {
+    "cookies": _ceiling("cookies", 10),
+    "location": _ceiling("location", 15),
+    "offers": _ceiling("offers", 15),
+    "category": _ceiling("category", 3),
+}
+
+# A tile container counts as settled once the DOM under it was quiet this long
+QUIET_MS = int(os.getenv("SCRAPER_WAIT_QUIET_MS", "150"))
+# ... or, while nothing matches yet, this long (an empty category)
+EMPTY_MS = int(os.getenv("SCRAPER_WAIT_EMPTY_MS", "500"))
+
+# Resolves with the element count once no mutation happened under the root for `quietMs`
+# (`emptyMs` while `selector` matches nothing), or when `ceilingMs` is reached.
+SETTLED_COUNT_JS = """
+    const [root, selector, quietMs, emptyMs, ceilingMs] = arguments;
+    const done = arguments[arguments.length - 1];
+    const scope = root || document.body;
+    const count = () => scope.querySelectorAll(selector).length;
+    let quiet = null;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(cap);
+        done(count());
+    };
+    const arm = () => {
+        clearTimeout(quiet);
+        quiet = setTimeout(finish, count() > 0 ? quietMs : emptyMs);
+    };
+    const observer = new MutationObserver(arm);
+    observer.observe(scope, {childList: true, subtree: true});
+    const cap = setTimeout(finish, ceilingMs);
+    arm();
+"""
+
+
+class WaitTimer:
+    """Condition-based waits that record how long each kind of wait took."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def _record(self, label, start_time):
+        self.totals[label] += time.time() - start_time
+        self.counts[label] += 1
+
+    # WebDriverWait with a ceiling from WAIT_CEILINGS; returns None on timeout
+    def until(self, label: str, condition, ceiling: str = None, poll: float = 0.05):
+        start_time = time.time()
+        try:
+            return WebDriverWait(
+                self.driver, WAIT_CEILINGS[ceiling or label], poll_frequency=poll
+            ).until(condition)
+        except TimeoutException:
+            return None
+        finally:
+            self._record(label, start_time)
+
+    # MutationObserver wait until the tile count under `root` stops changing
+    def settled_count(self, label: str, selector: str, root=None, ceiling: str = None):
+        limit = WAIT_CEILINGS[ceiling or label]
+        start_time = time.time()
+        try:
+            self.driver.set_script_timeout(limit + 5)
+            return self.driver.execute_async_script(
+                SETTLED_COUNT_JS, root, selector, QUIET_MS, EMPTY_MS, int(limit * 1000)
+            )
+        except TimeoutException:
+            return None
+        finally:
+            self._record(label, start_time)
+
+    def summary(self):
+        return {
+            label: {"seconds": round(self.totals[label], 3), "waits": self.counts[label]}
+            for label in self.totals
+        }
+
+    def print_summary(self):
+        for label, stats in self.summary().items():
+            print(f"Wait '{label}': {stats['seconds']:.2f} seconds over {stats['waits']} waits")
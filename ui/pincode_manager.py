@@ -1,8 +1,13 @@
 from qdrant_client import QdrantClient, models
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cleaning.helpers import stable_id
+from supermarket_scrapers.scrape_cache import promotion_week, week_start
+
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
@@ -12,8 +17,25 @@ qdrant = QdrantClient(
     api_key=os.getenv("QDRANT_API_KEY")
 )
 
-# Function to update pincode registry 
-def update_pincode_registry(pincode: str, num_products: int = None):
+# A partial scrape (some stores failed) is retried after this long, doubling with every
+# further partial scrape in the same promotion week
+PARTIAL_RETRY_SECONDS = float(os.getenv("PARTIAL_SCRAPE_RETRY_SECONDS", "3600"))
+
+# One registry point per pincode
+def pincode_point_id(pincode: str):
+    return stable_id("pincodes", pincode)
+
+# Whether a registry entry still covers the current promotion week
+def is_fresh(payload: dict, now: datetime = None):
+    now = now or datetime.now()
+    if payload.get("scraped_at", "") < week_start(promotion_week(now)).isoformat():
+        return False
+    if payload.get("status") == "partial":
+        return payload.get("retry_after", "") > now.isoformat()
+    return True
+
+# Function to update pincode registry; `store_errors` maps failed stores to their error
+def update_pincode_registry(pincode: str, num_products: int = None, store_errors: dict = None):
     
     try:
         # Check if pincodes collection exists, create if not
@@ -28,23 +50,45 @@ def update_pincode_registry(pincode: str, num_products: int = None):
                 collection_name="pincodes",
                 vectors_config=models.VectorParams(size=1, distance=models.Distance.COSINE)
             )
+            qdrant.create_payload_index(
+                collection_name="pincodes",
+                field_name="pincode",
+                field_schema=models.PayloadSchemaType.KEYWORD
+            )
         
         # Prepare pincode data
+        now = datetime.now()
         payload = {
             "pincode": pincode,
-            "scraped_at": datetime.now().isoformat(),
-            "status": "completed"
+            "scraped_at": now.isoformat(),
+            "status": "partial" if store_errors else "completed",
+            "failed_stores": sorted(store_errors or {})
         }
         
         if num_products is not None:
             payload["num_products"] = num_products
+
+        # Keep the query count across re-scrapes, it drives the background prefetch
+        existing = _find_pincode_points(pincode)
+        payload["query_count"] = max((pt.payload.get("query_count", 0) for pt in existing), default=0)
+
+        # Back off before scraping a partially scraped pincode again, so a store that keeps
+        # failing does not trigger a scrape on every query
+        if store_errors:
+            current_week_start = week_start(promotion_week(now)).isoformat()
+            attempts = 1 + max((
+                pt.payload.get("partial_attempts", 0) for pt in existing
+                if pt.payload.get("status") == "partial" and pt.payload.get("scraped_at", "") >= current_week_start
+            ), default=0)
+            payload["partial_attempts"] = attempts
+            payload["retry_after"] = (now + timedelta(seconds=PARTIAL_RETRY_SECONDS * 2 ** (attempts - 1))).isoformat()
             
         # Store in Qdrant
         qdrant.upsert(
             collection_name="pincodes",
             points=[
                 models.PointStruct(
-                    id=hash(pincode) % (2**63 - 1), 
+                    id=pincode_point_id(pincode),
                     vector=[0.0],  
                     payload=payload
                 )
@@ -57,20 +101,79 @@ def update_pincode_registry(pincode: str, num_products: int = None):
         print(f"Error updating pincode registry: {e}")
         return False
 
-# Function to check if a pincode exists
+# Function to check if a pincode has offers for the current promotion week
 def check_pincode_exists(pincode: str):
     
     try:
-        found, _ = qdrant.scroll(
-            collection_name="pincodes",
-            scroll_filter=models.Filter(
-                must=[models.FieldCondition(key="pincode", match=models.MatchValue(value=pincode))]
-            ),
-            limit=1
-        )
-        
-        return len(found) > 0
+        found = _find_pincode_points(pincode)
+
+        # Offers from earlier weeks have expired, so an older scrape does not count;
+        # a partial scrape counts until its retry time
+        return any(is_fresh(pt.payload) for pt in found)
             
     except Exception as e:
         print(f"Error checking pincode: {e}")
         return False
+
+
+
+def _find_pincode_points(pincode: str):
+    found, _ = qdrant.scroll(
+        collection_name="pincodes",
+        scroll_filter=models.Filter(
+            must=[models.FieldCondition(key="pincode", match=models.MatchValue(value=pincode))]
+        ),
+        limit=100
+    )
+    return found
+
+# Function to count a user query for a pincode
+def record_pincode_query(pincode: str):
+
+    try:
+        existing = _find_pincode_points(pincode)
+        if not existing:
+            return False
+
+        count = max(pt.payload.get("query_count", 0) for pt in existing) + 1
+        qdrant.set_payload(
+            collection_name="pincodes",
+            payload={"query_count": count, "last_queried_at": datetime.now().isoformat()},
+            points=[pt.id for pt in existing]
+        )
+        return True
+
+    except Exception as e:
+        print(f"Error recording pincode query: {e}")
+        return False
+
+# Function to list the most queried pincodes with their last scrape time
+def get_popular_pincodes(limit: int = 20):
+
+    try:
+        registry = {}
+        offset = None
+        while True:
+            items, offset = qdrant.scroll(
+                collection_name="pincodes",
+                limit=200,
+                with_vectors=False,
+                offset=offset
+            )
+            for pt in items:
+                pincode = pt.payload.get("pincode")
+                entry = registry.setdefault(
+                    pincode, {"pincode": pincode, "query_count": 0, "scraped_at": "", "fresh": False}
+                )
+                entry["query_count"] = max(entry["query_count"], pt.payload.get("query_count", 0))
+                entry["scraped_at"] = max(entry["scraped_at"], pt.payload.get("scraped_at", ""))
+                entry["fresh"] = entry["fresh"] or is_fresh(pt.payload)
+            if offset is None:
+                break
+
+        ranked = sorted(registry.values(), key=lambda e: e["query_count"], reverse=True)
+        return [e for e in ranked if e["query_count"] > 0][:limit]
+
+    except Exception as e:
+        print(f"Error listing popular pincodes: {e}")
+        return []
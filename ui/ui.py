@@ -7,17 +7,15 @@ import warnings
 import sys
 from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Streamlit puts this folder first on sys.path, where ui.py would shadow the ui package
+sys.path = [p for p in sys.path if os.path.abspath(p or ".") != os.path.dirname(os.path.abspath(__file__))]
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
 
 
 # --------------------------------------------------
 # Import engines 
 # --------------------------------------------------
-from supermarket_scrapers.rewe_scraper import scrape_rewe
-from supermarket_scrapers.aldi_scraper import scrape_aldi
-from scraping_engine.scraper_engine import ingest_gemini
-from scraping_engine.bert_scraper_engine import ingest_bert
-from scraping_engine.qwen_scraper_engine import ingest_qwen
+from scraping_engine.pipeline import refresh_pincode
 from rag_engine.rag_engine import perform_rag
 from rag_engine.bert_rag_engine import perform_rag_bert
 from rag_engine.qwen_rag_engine import perform_rag_qwen
@@ -229,7 +227,7 @@ if ss.get("processing"):
     # -------- PHASE 1 — CHECK DATA --------
     if ss["scraping_phase"] == "checking":
         print(f"[UI] Checking for existing data for pincode: {pin}")
-        from pincode_manager import check_pincode_exists
+        from ui.pincode_manager import check_pincode_exists
         
         if pin == "ALL" or check_pincode_exists(pin):
             print(f"[UI] Data found for pincode {pin}, moving to RAG phase")
@@ -238,38 +236,17 @@ if ss.get("processing"):
         else:
             print(f"[UI] No data found for pincode {pin}, starting scraping")
             ss["scraping_phase"] = "scraping"
-            ss["loading_message"] = "Scraping REWE & ALDI… Please wait (40–70 seconds)."
+            ss["loading_message"] = "Scraping REWE & ALDI… Please wait."
         st.rerun()
 
     # -------- PHASE 2 — SCRAPE --------
     if ss["scraping_phase"] == "scraping":
         try:
             print(f"[UI] Starting scraping for pincode {pin}")
-            ss["loading_message"] = "Scraping REWE data..."
+            ss["loading_message"] = "Scraping REWE & ALDI data..."
 
-            df_rewe = scrape_rewe(pin)
-            print(f"[UI] REWE scraping complete: {len(df_rewe)} items")
-
-            ss["loading_message"] = "Scraping ALDI data..."
-            df_aldi = scrape_aldi(pin)
-            print(f"[UI] ALDI scraping complete: {len(df_aldi)} items")
-
-            df = pd.concat([df_rewe, df_aldi], ignore_index=True)
-            print(f"[UI] Combined data: {len(df)} total items")
-            ss["loading_message"] = "Processing and indexing data..."
-            
-            ingest_gemini(df, pin)
-            print(f"[UI] Gemini ingestion complete")
-
-            ingest_bert(df, pin)
-            print(f"[UI] BERT ingestion complete")
-
-            ingest_qwen(df, pin)
-            print(f"[UI] Qwen ingestion complete")
-
-            from pincode_manager import update_pincode_registry
-            update_pincode_registry(pin)
-            print(f"[UI] Pincode registry updated for {pin}")
+            result = refresh_pincode(pin)
+            print(f"[UI] Scraping and ingestion complete: {result['num_products']} total items")
             ss["scraping_phase"] = "rag"
             ss["loading_message"] = "Searching best matches…"
             print(f"[UI] Scraping complete, moving to RAG phase")
@@ -286,6 +263,11 @@ if ss.get("processing"):
     # -------- PHASE 3 — RAG --------
     if ss["scraping_phase"] == "rag":
         try:
+            # Query counts drive the background prefetch of popular pincodes
+            if pin != "ALL":
+                from ui.pincode_manager import record_pincode_query
+                record_pincode_query(pin)
+
             if model == "Gemini":
                 result = perform_rag(q, pin)
             elif model == "BERT":